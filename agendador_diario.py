@@ -6,53 +6,150 @@ Desenvolvido em Português Brasileiro
 """
 
 import asyncio
-import schedule
-import time
 import logging
+import logging.handlers
+import queue
+from collections import deque
 from datetime import datetime, timedelta
 from typing import Dict, Any
 import json
 import os
 
-# Configuração de logs
+# Tentar importar orjson (serialização rápida)
+try:
+    import orjson
+    ORJSON_DISPONIVEL = True
+except ImportError:
+    ORJSON_DISPONIVEL = False
+
+# Tentar importar uvloop (event loop baseado em libuv)
+try:
+    import uvloop
+    UVLOOP_DISPONIVEL = True
+except ImportError:
+    UVLOOP_DISPONIVEL = False
+
+# Tentar importar aiohttp (disparo dos RPAs 3 e 4 via API)
+try:
+    import aiohttp
+    AIOHTTP_DISPONIVEL = True
+except ImportError:
+    AIOHTTP_DISPONIVEL = False
+
+# Configuração de logs: o loop asyncio só enfileira registros; o arquivo é
+# anexado ao QueueListener pelo AgendadorRPA depois que a pasta logs/ existe
+FORMATO_LOG = '%(asctime)s - %(levelname)s - %(message)s'
+_fila_logs = queue.SimpleQueue()
+_listener_logs = None
+
 logging.basicConfig(
     level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
+    format=FORMATO_LOG,
     handlers=[
-        logging.FileHandler('logs/agendador_rpa.log'),
+        logging.handlers.QueueHandler(_fila_logs),
         logging.StreamHandler()
     ]
 )
+
+def _iniciar_log_arquivo(pasta_logs: str):
+    """Inicia o QueueListener com o arquivo rotativo (apenas uma vez por processo)"""
+    global _listener_logs
+    
+    if _listener_logs is not None:
+        return
+    
+    handler = logging.handlers.RotatingFileHandler(
+        os.path.join(pasta_logs, 'agendador_rpa.log'),
+        maxBytes=10_000_000,
+        backupCount=5,
+        encoding='utf-8',
+        delay=True
+    )
+    handler.setFormatter(logging.Formatter(FORMATO_LOG))
+    
+    _listener_logs = logging.handlers.QueueListener(_fila_logs, handler, respect_handler_level=True)
+    _listener_logs.start()
+
 logger = logging.getLogger(__name__)
 
 # Importa RPAs 1 e 2 (que rodam diariamente)
+from core.base_rpa import ResultadoRPA, descarregar_auditoria
+from core.data_manager import anexar_historico, encerrar_sistema_dados
+
 try:
     from rpa_coleta_indices import executar_coleta_indices
     from rpa_analise_planilhas import executar_analise_planilhas
 except ImportError:
     logger.warning("RPAs não encontrados - usando simulação")
     
-    async def executar_coleta_indices(planilha_id, credenciais_google=None):
-        class MockResult:
-            def __init__(self):
-                self.sucesso = True
-                self.dados = {
-                    "ipca": {"valor": 4.62, "fonte": "IBGE"},
-                    "igpm": {"valor": 3.89, "fonte": "FGV"}
-                }
-        return MockResult()
+    async def executar_coleta_indices(planilha_id, credenciais_google=None) -> ResultadoRPA:
+        return ResultadoRPA(
+            sucesso=True,
+            mensagem="Coleta de índices simulada",
+            dados={
+                "ipca": {"valor": 4.62, "fonte": "IBGE"},
+                "igpm": {"valor": 3.89, "fonte": "FGV"}
+            }
+        )
     
-    async def executar_analise_planilhas(planilha_calculo_id, planilha_apoio_id, credenciais_google=None):
-        class MockResult:
-            def __init__(self):
-                self.sucesso = True
-                self.dados = {
-                    "contratos_para_reajuste": 10,
-                    "fila_processamento": [
-                        {"numero_titulo": "123456", "cliente": "CLIENTE TESTE"}
-                    ]
-                }
-        return MockResult()
+    async def executar_analise_planilhas(planilha_calculo_id, planilha_apoio_id, credenciais_google=None) -> ResultadoRPA:
+        return ResultadoRPA(
+            sucesso=True,
+            mensagem="Análise de planilhas simulada",
+            dados={
+                "contratos_para_reajuste": 10,
+                "fila_processamento": [
+                    {"numero_titulo": "123456", "cliente": "CLIENTE TESTE"}
+                ]
+            }
+        )
+
+# Execuções mantidas em memória (o arquivo JSONL segue a retenção do data_manager)
+LIMITE_HISTORICO = 30
+
+def _serializar_linha(registro: Dict[str, Any]) -> bytes:
+    """Serializa um registro do histórico como uma linha JSONL"""
+    if ORJSON_DISPONIVEL:
+        return orjson.dumps(
+            registro,
+            default=str,
+            option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_DATACLASS | orjson.OPT_APPEND_NEWLINE
+        )
+    return json.dumps(registro, ensure_ascii=False, default=str).encode('utf-8') + b"\n"
+
+# Sessão HTTP reutilizada entre disparos (keep-alive com a API local)
+_sessao_http = None
+_sessao_loop = None
+
+async def _obter_sessao_http():
+    """Retorna sessão aiohttp compartilhada, criando-a no loop atual se necessário"""
+    global _sessao_http, _sessao_loop
+    
+    loop = asyncio.get_running_loop()
+    if _sessao_http is None or _sessao_http.closed or _sessao_loop is not loop:
+        _sessao_http = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=50, keepalive_timeout=30),
+            timeout=aiohttp.ClientTimeout(total=30)
+        )
+        _sessao_loop = loop
+    return _sessao_http
+
+async def fechar_sessao_http():
+    """Fecha a sessão aiohttp compartilhada (chamar no encerramento do loop)"""
+    global _sessao_http, _sessao_loop
+    
+    if _sessao_http is not None and not _sessao_http.closed:
+        await _sessao_http.close()
+    _sessao_http = None
+    _sessao_loop = None
+
+def _proximo_horario(agora: datetime, horario: str) -> datetime:
+    """Calcula o próximo disparo diário no horário 'HH:MM' a partir de agora"""
+    hora, minuto = (int(parte) for parte in horario.split(":"))
+    alvo = agora.replace(hour=hora, minute=minuto, second=0, microsecond=0)
+    if alvo <= agora:
+        alvo += timedelta(days=1)
+    return alvo
 
 class AgendadorRPA:
     """
@@ -62,9 +159,11 @@ class AgendadorRPA:
     
     def __init__(self):
         self.configuracoes = self._carregar_configuracoes()
-        self.historico_execucoes = []
+        self.historico_execucoes = deque(maxlen=LIMITE_HISTORICO)
         self.pasta_logs = "logs"
+        self.arquivo_historico = os.path.join(self.pasta_logs, "historico_execucoes.jsonl")
         self._criar_pasta_logs()
+        _iniciar_log_arquivo(self.pasta_logs)
         
     def _criar_pasta_logs(self):
         """Cria pasta de logs se não existir"""
@@ -82,19 +181,20 @@ class AgendadorRPA:
             "webhook_notificacao": os.getenv("WEBHOOK_NOTIFICACAO", None)
         }
     
-    def salvar_execucao(self, resultado: Dict[str, Any]):
-        """Salva resultado da execução no histórico"""
+    async def salvar_execucao(self, resultado: Dict[str, Any]):
+        """Salva resultado da execução no histórico sem bloquear o event loop"""
         execucao = {
             "timestamp": datetime.now().isoformat(),
             "resultado": resultado
         }
         
         self.historico_execucoes.append(execucao)
-        
-        # Salva em arquivo JSON para dashboard
-        arquivo_historico = f"{self.pasta_logs}/historico_execucoes.json"
-        with open(arquivo_historico, 'w', encoding='utf-8') as f:
-            json.dump(self.historico_execucoes[-30:], f, indent=2, ensure_ascii=False)  # Últimas 30
+        await asyncio.to_thread(self._gravar_historico_sync, execucao)
+    
+    def _gravar_historico_sync(self, execucao: Dict[str, Any]):
+        """Append de uma linha JSONL no histórico (executado fora do event loop)"""
+        # Mesmo arquivo do DataManagerHibrido: usa a trava e a retenção dele
+        anexar_historico(self.arquivo_historico, _serializar_linha(execucao))
     
     async def executar_rpas_diarios(self):
         """
@@ -102,9 +202,12 @@ class AgendadorRPA:
         """
         logger.info("🚀 Iniciando execução diária dos RPAs 1 e 2")
         
+        # Um único datetime.now(): data e horário fatiados do ISO
+        inicio_iso = datetime.now().isoformat()
+        
         resultado_execucao = {
-            "data": datetime.now().strftime("%Y-%m-%d"),
-            "horario": datetime.now().strftime("%H:%M:%S"),
+            "data": inicio_iso[:10],
+            "horario": inicio_iso[11:19],
             "rpa1_coleta_indices": None,
             "rpa2_analise_planilhas": None,
             "fila_gerada": False,
@@ -124,14 +227,14 @@ class AgendadorRPA:
             
             resultado_execucao["rpa1_coleta_indices"] = {
                 "sucesso": resultado_rpa1.sucesso,
-                "dados": resultado_rpa1.dados if hasattr(resultado_rpa1, 'dados') else {},
-                "erro": getattr(resultado_rpa1, 'erro', None)
+                "dados": resultado_rpa1.dados,
+                "erro": resultado_rpa1.erro
             }
             
             if resultado_rpa1.sucesso:
                 logger.info("✅ RPA 1 concluído com sucesso")
             else:
-                logger.error(f"❌ RPA 1 falhou: {getattr(resultado_rpa1, 'erro', 'Erro desconhecido')}")
+                logger.error(f"❌ RPA 1 falhou: {resultado_rpa1.erro or 'Erro desconhecido'}")
             
             # EXECUTA RPA 2: Análise de Planilhas  
             logger.info("📋 Executando RPA 2 - Análise de Planilhas")
@@ -144,15 +247,15 @@ class AgendadorRPA:
             
             resultado_execucao["rpa2_analise_planilhas"] = {
                 "sucesso": resultado_rpa2.sucesso,
-                "dados": resultado_rpa2.dados if hasattr(resultado_rpa2, 'dados') else {},
-                "erro": getattr(resultado_rpa2, 'erro', None)
+                "dados": resultado_rpa2.dados,
+                "erro": resultado_rpa2.erro
             }
             
             if resultado_rpa2.sucesso:
                 logger.info("✅ RPA 2 concluído com sucesso")
                 
                 # Verifica se há contratos para processar
-                dados_rpa2 = getattr(resultado_rpa2, 'dados', {})
+                dados_rpa2 = resultado_rpa2.dados
                 contratos_para_reajuste = dados_rpa2.get('contratos_para_reajuste', 0)
                 fila_processamento = dados_rpa2.get('fila_processamento', [])
                 
@@ -167,7 +270,7 @@ class AgendadorRPA:
                     logger.info("ℹ️ Nenhum contrato identificado para reparcelamento hoje")
                     
             else:
-                logger.error(f"❌ RPA 2 falhou: {getattr(resultado_rpa2, 'erro', 'Erro desconhecido')}")
+                logger.error(f"❌ RPA 2 falhou: {resultado_rpa2.erro or 'Erro desconhecido'}")
             
             # Determina sucesso geral
             resultado_execucao["sucesso_geral"] = (
@@ -180,7 +283,7 @@ class AgendadorRPA:
             resultado_execucao["erro_geral"] = str(e)
         
         # Salva resultado no histórico
-        self.salvar_execucao(resultado_execucao)
+        await self.salvar_execucao(resultado_execucao)
         
         # Notifica se configurado
         await self._enviar_notificacao(resultado_execucao)
@@ -192,33 +295,34 @@ class AgendadorRPA:
         """
         Dispara RPAs 3 e 4 via API para processar a fila
         """
+        if not AIOHTTP_DISPONIVEL:
+            logger.warning("⚠️ aiohttp não disponível - simulando disparo dos RPAs 3 e 4")
+            resultado_execucao["rpas_34_disparados"] = True
+            resultado_execucao["workflow_id"] = "simulated_123"
+            return
+        
         try:
-            import aiohttp
-            
             # URL da API local
             api_url = "http://localhost:5000"
             
-            async with aiohttp.ClientSession() as session:
-                # Dispara workflow dos RPAs 3 e 4 via API
-                payload = {
-                    "planilha_calculo_id": self.configuracoes["planilha_calculo_id"],
-                    "planilha_apoio_id": self.configuracoes["planilha_apoio_id"],
-                    "processar_todos": True
-                }
-                
-                async with session.post(f"{api_url}/workflow/reparcelamento", json=payload) as response:
-                    if response.status == 200:
-                        resultado = await response.json()
-                        resultado_execucao["rpas_34_disparados"] = True
-                        resultado_execucao["workflow_id"] = resultado.get("dados", {}).get("execucao_id")
-                        logger.info(f"✅ RPAs 3 e 4 disparados via API - ID: {resultado_execucao.get('workflow_id')}")
-                    else:
-                        logger.error(f"❌ Falha ao disparar RPAs 3 e 4: {response.status}")
-                        
-        except ImportError:
-            logger.warning("⚠️ aiohttp não disponível - simulando disparo dos RPAs 3 e 4")
-            resultado_execucao["rpas_34_disparados"] = True
-            resultado_execucao["workflow_id"] = "simulated_123"
+            session = await _obter_sessao_http()
+            
+            # Dispara workflow dos RPAs 3 e 4 via API
+            payload = {
+                "planilha_calculo_id": self.configuracoes["planilha_calculo_id"],
+                "planilha_apoio_id": self.configuracoes["planilha_apoio_id"],
+                "processar_todos": True
+            }
+            
+            async with session.post(f"{api_url}/workflow/reparcelamento", json=payload) as response:
+                if response.status == 200:
+                    resultado = await response.json()
+                    resultado_execucao["rpas_34_disparados"] = True
+                    resultado_execucao["workflow_id"] = resultado.get("dados", {}).get("execucao_id")
+                    logger.info(f"✅ RPAs 3 e 4 disparados via API - ID: {resultado_execucao.get('workflow_id')}")
+                else:
+                    logger.error(f"❌ Falha ao disparar RPAs 3 e 4: {response.status}")
+                    
         except Exception as e:
             logger.error(f"❌ Erro ao disparar RPAs 3 e 4: {str(e)}")
     
@@ -239,31 +343,54 @@ class AgendadorRPA:
         """
         horario = self.configuracoes["horario_execucao"]
         
-        # Agenda execução diária
-        schedule.every().day.at(horario).do(
-            lambda: asyncio.run(self.executar_rpas_diarios())
-        )
+        # Valida o horário já na configuração
+        _proximo_horario(datetime.now(), horario)
         
         logger.info(f"⏰ Agendamento configurado para {horario} todos os dias")
-        
-        # Permite execução manual para teste
-        schedule.every().monday.at("09:00").tag("teste_semanal")
     
     def executar_agora(self):
         """Executa RPAs imediatamente (para teste)"""
         logger.info("🔄 Execução manual iniciada")
-        return asyncio.run(self.executar_rpas_diarios())
+        return asyncio.run(self._executar_e_encerrar())
+    
+    async def _executar_e_encerrar(self):
+        """Executa RPAs diários e, antes do loop terminar, grava histórico e auditorias pendentes e fecha a sessão HTTP"""
+        try:
+            return await self.executar_rpas_diarios()
+        finally:
+            await encerrar_sistema_dados()
+            await descarregar_auditoria()
+            await fechar_sessao_http()
+    
+    async def _executar_para_sempre(self):
+        """
+        Loop asyncio único: dorme até o próximo horário e executa os RPAs
+        """
+        horario = self.configuracoes["horario_execucao"]
+        
+        try:
+            while True:
+                agora = datetime.now()
+                proxima = _proximo_horario(agora, horario)
+                logger.info(f"📅 Próxima execução: {proxima}")
+                
+                await asyncio.sleep((proxima - agora).total_seconds())
+                
+                try:
+                    await self.executar_rpas_diarios()
+                except Exception as e:
+                    logger.error(f"💥 Erro no ciclo do agendador: {str(e)}")
+        finally:
+            await encerrar_sistema_dados()
+            await descarregar_auditoria()
+            await fechar_sessao_http()
     
     def iniciar_agendador(self):
         """
         Inicia o loop do agendador
         """
         logger.info("🚀 Agendador RPA iniciado")
-        logger.info(f"📅 Próxima execução: {schedule.next_run()}")
-        
-        while True:
-            schedule.run_pending()
-            time.sleep(60)  # Verifica a cada minuto
+        asyncio.run(self._executar_para_sempre())
 
 def main():
     """
@@ -275,6 +402,10 @@ def main():
     print("🎯 RPAs 3 e 4: Disparados conforme demanda")
     print("=" * 80)
     
+    # Instala o uvloop antes de criar qualquer loop/sessão aiohttp
+    if UVLOOP_DISPONIVEL:
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    
     agendador = AgendadorRPA()
     
     # Configurações
@@ -6,32 +6,71 @@ Desenvolvido em Português Brasileiro
 """
 
 import asyncio
+import logging
 import os
+import secrets
+import time
+import types
+from collections import OrderedDict
+from itertools import islice
 from datetime import datetime
 from typing import Dict, Any, Optional, List
 import uvicorn
 from fastapi import FastAPI, HTTPException, BackgroundTasks, Depends
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
-from pydantic import BaseModel, Field
+from fastapi.responses import ORJSONResponse, Response
+from pydantic import BaseModel, ConfigDict, Field
+import orjson
 import structlog
 
+from core.base_rpa import conectar_mongodb, descarregar_auditoria, desconectar_mongodb
+from core.browser_manager import pool_browsers
+from core.data_manager import encerrar_sistema_dados
+
 # Importa os 4 RPAs refatorados
 from rpa_coleta_indices.rpa_coleta_indices import executar_coleta_indices
 from rpa_analise_planilhas.rpa_analise_planilhas import executar_analise_planilhas
 from rpa_sienge.rpa_sienge import executar_processamento_sienge
 from rpa_sicredi.rpa_sicredi import executar_processamento_sicredi
 
-# Configuração de logs
+# Configuração de logs: eventos key=value renderizados em JSON via orjson.
+# O bound logger filtrado transforma chamadas abaixo de INFO em no-op.
+structlog.configure(
+    processors=[
+        structlog.processors.add_log_level,
+        structlog.processors.TimeStamper(fmt="iso"),
+        structlog.processors.JSONRenderer(serializer=orjson.dumps)
+    ],
+    wrapper_class=structlog.make_filtering_bound_logger(logging.INFO),
+    logger_factory=structlog.BytesLoggerFactory(),
+    cache_logger_on_first_use=True
+)
 logger = structlog.get_logger()
 
+def _orjson_default(obj: Any) -> Any:
+    """Converte tipos não suportados nativamente pelo orjson"""
+    if hasattr(obj, "isoformat"):
+        return obj.isoformat()
+    return str(obj)
+
+class RespostaORJSON(ORJSONResponse):
+    """Resposta JSON serializada com orjson (bytes UTF-8 direto em C)"""
+    
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(
+            content,
+            default=_orjson_default,
+            option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        )
+
 # FastAPI app
 app = FastAPI(
     title="Sistema RPA de Reparcelamento",
     description="API REST para orquestração dos 4 RPAs de reparcelamento",
     version="2.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    default_response_class=RespostaORJSON
 )
 
 # CORS
@@ -43,12 +82,37 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.on_event("startup")
+async def ao_iniciar():
+    """Abre o pool de conexões do MongoDB, reaproveitado por todas as execuções"""
+    await conectar_mongodb()
+
+@app.on_event("shutdown")
+async def ao_encerrar():
+    """Grava histórico e auditorias pendentes, fecha os browsers do pool e desconecta o MongoDB"""
+    await encerrar_sistema_dados()
+    await descarregar_auditoria()
+    await pool_browsers.fechar()
+    await desconectar_mongodb()
+
+# Timestamp ISO reaproveitado por até meio segundo entre respostas
+_TS_CACHE = ["", 0.0]
+
+def _agora_iso() -> str:
+    """Retorna datetime.now().isoformat() com cache de 0,5s"""
+    t = time.time()
+    if t - _TS_CACHE[1] > 0.5:
+        _TS_CACHE[:] = [datetime.fromtimestamp(t).isoformat(), t]
+    return _TS_CACHE[0]
+
 # ============================================================================
 # MODELOS PYDANTIC
 # ============================================================================
 
 class ParametrosWorkflow(BaseModel):
     """Parâmetros para executar workflow completo"""
+    model_config = ConfigDict(extra="ignore")
+    
     planilha_calculo_id: str = Field(..., description="ID da planilha BASE DE CÁLCULO REPARCELAMENTO")
     planilha_apoio_id: str = Field(..., description="ID da planilha Base de apoio")
     processar_todos: bool = Field(False, description="Se True, processa todos os contratos identificados")
@@ -83,35 +147,96 @@ class RespostaAPI(BaseModel):
     mensagem: str
     dados: Optional[Dict[str, Any]] = None
     erro: Optional[str] = None
-    timestamp: str = Field(default_factory=lambda: datetime.now().isoformat())
+    timestamp: str = Field(default_factory=_agora_iso)
 
 # ============================================================================
 # STORAGE SIMPLES PARA EXECUÇÕES EM ANDAMENTO
 # ============================================================================
 
-execucoes_ativas: Dict[str, Dict[str, Any]] = {}
+# LRU limitado: execuções mais antigas são removidas da memória e persistidas em disco
+MAX_EXECUCOES_MEMORIA = int(os.getenv("MAX_EXECUCOES_MEMORIA", "500"))
+ARQUIVO_EXECUCOES_REMOVIDAS = os.path.join("logs", "execucoes_removidas.jsonl")
+
+# Só execuções encerradas saem da memória; as em andamento ficam até terminar
+STATUS_FINAIS = frozenset({"concluido", "erro"})
+
+# Variáveis de ambiente das credenciais lidas uma única vez na importação
+_ENV = types.MappingProxyType({
+    nome: os.getenv(nome, "")
+    for nome in (
+        "SIENGE_URL", "SIENGE_USERNAME", "SIENGE_PASSWORD",
+        "SICREDI_URL", "SICREDI_USERNAME", "SICREDI_PASSWORD"
+    )
+})
+
+# Concorrência máxima dos RPAs 3 e 4 dentro de um workflow
+SIENGE_CONCORRENCIA = int(os.getenv("SIENGE_CONCURRENCY", "4"))
+SICREDI_CONCORRENCIA = int(os.getenv("SICREDI_CONCURRENCY", "4"))
+
+execucoes_ativas: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
 
-def gerar_id_execucao() -> str:
-    """Gera ID único para execução"""
-    return f"exec_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{os.urandom(4).hex()}"
+def gerar_id_execucao(agora: Optional[datetime] = None) -> str:
+    """
+    Gera ID único para execução no estilo ULID: 48 bits de timestamp em ms
+    (hex, ordenável lexicograficamente) + 64 bits aleatórios
+    """
+    ms = int((agora.timestamp() if agora else time.time()) * 1000)
+    return f"exec_{ms:012x}{secrets.token_hex(8)}"
 
-def salvar_execucao(execucao_id: str, dados: Dict[str, Any]):
-    """Salva dados da execução"""
+def salvar_execucao(execucao_id: str, dados: Dict[str, Any]) -> List[tuple]:
+    """Salva dados da execução e retorna as execuções removidas pelo limite do LRU"""
     execucoes_ativas[execucao_id] = dados
+    execucoes_ativas.move_to_end(execucao_id)
+    
+    excesso = len(execucoes_ativas) - MAX_EXECUCOES_MEMORIA
+    if excesso <= 0:
+        return []
+    
+    # Mais antigas primeiro, pulando as que ainda estão em andamento
+    chaves = list(islice(
+        (chave for chave, execucao in execucoes_ativas.items() if execucao.get("status") in STATUS_FINAIS),
+        excesso
+    ))
+    return [(chave, execucoes_ativas.pop(chave)) for chave in chaves]
 
 def obter_execucao(execucao_id: str) -> Optional[Dict[str, Any]]:
     """Obtém dados da execução"""
-    return execucoes_ativas.get(execucao_id)
+    execucao = execucoes_ativas.get(execucao_id)
+    if execucao is not None:
+        execucoes_ativas.move_to_end(execucao_id)
+    return execucao
+
+def persistir_execucoes_removidas(removidas: List[tuple]):
+    """Grava em JSONL as execuções removidas da memória (executado em background)"""
+    if not removidas:
+        return
+    
+    os.makedirs(os.path.dirname(ARQUIVO_EXECUCOES_REMOVIDAS), exist_ok=True)
+    with open(ARQUIVO_EXECUCOES_REMOVIDAS, "ab") as f:
+        for execucao_id, dados in removidas:
+            f.write(orjson.dumps({"execucao_id": execucao_id, **dados}, default=_orjson_default))
+            f.write(b"\n")
+
+def montar_resposta(mensagem: str, dados: Optional[Dict[str, Any]] = None,
+                    sucesso: bool = True, erro: Optional[str] = None,
+                    timestamp: Optional[str] = None) -> Dict[str, Any]:
+    """Monta resposta padrão como dict simples (mesmo formato de RespostaAPI)"""
+    return {
+        "sucesso": sucesso,
+        "mensagem": mensagem,
+        "dados": dados,
+        "erro": erro,
+        "timestamp": timestamp or _agora_iso()
+    }
 
 # ============================================================================
 # ENDPOINTS PRINCIPAIS
 # ============================================================================
 
-@app.get("/", response_model=RespostaAPI)
+@app.get("/")
 async def root():
     """Endpoint raiz com informações do sistema"""
-    return RespostaAPI(
-        sucesso=True,
+    return montar_resposta(
         mensagem="Sistema RPA de Reparcelamento v2.0 - Arquitetura Refatorada",
         dados={
             "versao": "2.0.0",
@@ -126,18 +251,32 @@ async def root():
         }
     )
 
-@app.get("/health", response_model=RespostaAPI)
+# Corpo do /health pré-serializado; só é refeito quando o timestamp ou o total mudam
+_cache_health: Dict[str, Any] = {"chave": None, "corpo": b""}
+
+def _corpo_health() -> bytes:
+    """Retorna o corpo JSON do health check, reaproveitando o cache"""
+    agora_iso = _agora_iso()
+    chave = (agora_iso, len(execucoes_ativas))
+    
+    if _cache_health["chave"] != chave:
+        _cache_health["corpo"] = orjson.dumps(montar_resposta(
+            mensagem="Sistema funcionando corretamente",
+            dados={
+                "status": "healthy",
+                "memoria_execucoes": chave[1],
+                "timestamp_verificacao": agora_iso
+            },
+            timestamp=agora_iso
+        ))
+        _cache_health["chave"] = chave
+    
+    return _cache_health["corpo"]
+
+@app.get("/health")
 async def health_check():
     """Health check do sistema"""
-    return RespostaAPI(
-        sucesso=True,
-        mensagem="Sistema funcionando corretamente",
-        dados={
-            "status": "healthy",
-            "memoria_execucoes": len(execucoes_ativas),
-            "timestamp_verificacao": datetime.now().isoformat()
-        }
-    )
+    return Response(content=_corpo_health(), media_type="application/json")
 
 # ============================================================================
 # WORKFLOW COMPLETO
@@ -152,21 +291,29 @@ async def executar_workflow_reparcelamento(
     Executa workflow completo de reparcelamento (4 RPAs em sequência)
     """
     try:
-        execucao_id = gerar_id_execucao()
+        agora = datetime.now()
+        execucao_id = gerar_id_execucao(agora)
+        
+        # Dict para o background e JSON pronto (Fragment) para as leituras de status,
+        # que passam a embutir os bytes sem reserializar os parâmetros
+        payload = parametros.model_dump(mode="json")
         
         # Salva execução como iniciada
-        salvar_execucao(execucao_id, {
+        removidas = salvar_execucao(execucao_id, {
             "status": "iniciado",
             "etapa_atual": "preparando",
-            "inicio": datetime.now().isoformat(),
-            "parametros": parametros.dict()
+            "inicio": agora.isoformat(),
+            "parametros": orjson.Fragment(parametros.model_dump_json())
         })
         
+        if removidas:
+            background_tasks.add_task(persistir_execucoes_removidas, removidas)
+        
         # Executa workflow em background
         background_tasks.add_task(
             executar_workflow_background,
             execucao_id,
-            parametros
+            payload
         )
         
         return RespostaAPI(
@@ -180,10 +327,10 @@ async def executar_workflow_reparcelamento(
         )
         
     except Exception as e:
-        logger.error(f"Erro ao iniciar workflow: {str(e)}")
+        logger.error("workflow.erro_inicio", erro=str(e))
         raise HTTPException(status_code=500, detail=f"Erro interno: {str(e)}")
 
-@app.get("/workflow/status/{execucao_id}", response_model=RespostaAPI)
+@app.get("/workflow/status/{execucao_id}")
 async def obter_status_workflow(execucao_id: str):
     """
     Obtém status de execução do workflow
@@ -193,27 +340,32 @@ async def obter_status_workflow(execucao_id: str):
     if not execucao:
         raise HTTPException(status_code=404, detail="Execução não encontrada")
     
-    return RespostaAPI(
-        sucesso=True,
+    # Resposta direta: evita o jsonable_encoder e preserva o Fragment dos parâmetros
+    return RespostaORJSON(montar_resposta(
         mensagem=f"Status da execução {execucao_id}",
         dados=execucao
-    )
+    ))
 
-async def executar_workflow_background(execucao_id: str, parametros: ParametrosWorkflow):
+async def executar_workflow_background(execucao_id: str, parametros: Dict[str, Any]):
     """
     Executa workflow completo em background
     """
+    # Referência local: o dict é atualizado in-place durante todo o workflow
+    execucao = obter_execucao(execucao_id)
+    if execucao is None:
+        logger.warning("workflow.execucao_nao_encontrada", execucao_id=execucao_id)
+        return
+    
     try:
         # Atualiza status
-        execucao = obter_execucao(execucao_id)
         execucao["etapa_atual"] = "rpa_coleta_indices"
         execucao["etapas_concluidas"] = []
         
         # ETAPA 1: Coleta de Índices
-        logger.info(f"[{execucao_id}] Executando RPA Coleta de Índices")
+        logger.info("rpa.inicio", execucao_id=execucao_id, etapa="coleta_indices")
         resultado_indices = await executar_coleta_indices(
-            planilha_id=parametros.planilha_calculo_id,
-            credenciais_google=parametros.credenciais_google
+            planilha_id=parametros["planilha_calculo_id"],
+            credenciais_google=parametros["credenciais_google"]
         )
         
         if not resultado_indices.sucesso:
@@ -226,11 +378,11 @@ async def executar_workflow_background(execucao_id: str, parametros: ParametrosW
         execucao["etapa_atual"] = "rpa_analise_planilhas"
         
         # ETAPA 2: Análise de Planilhas
-        logger.info(f"[{execucao_id}] Executando RPA Análise de Planilhas")
+        logger.info("rpa.inicio", execucao_id=execucao_id, etapa="analise_planilhas")
         resultado_analise = await executar_analise_planilhas(
-            planilha_calculo_id=parametros.planilha_calculo_id,
-            planilha_apoio_id=parametros.planilha_apoio_id,
-            credenciais_google=parametros.credenciais_google
+            planilha_calculo_id=parametros["planilha_calculo_id"],
+            planilha_apoio_id=parametros["planilha_apoio_id"],
+            credenciais_google=parametros["credenciais_google"]
         )
         
         if not resultado_analise.sucesso:
@@ -250,29 +402,44 @@ async def executar_workflow_background(execucao_id: str, parametros: ParametrosW
             execucao["fim"] = datetime.now().isoformat()
             return
         
-        # ETAPA 3: Processamento Sienge
+        # ETAPA 3: Processamento Sienge (contratos em paralelo, limitados pelo semáforo)
         execucao["etapa_atual"] = "rpa_sienge"
-        contratos_processados = []
         
-        limite = len(contratos_reajuste) if parametros.processar_todos else min(3, len(contratos_reajuste))
+        limite = len(contratos_reajuste) if parametros["processar_todos"] else min(3, len(contratos_reajuste))
         
-        for i, contrato in enumerate(contratos_reajuste[:limite]):
-            logger.info(f"[{execucao_id}] Processando contrato {i+1}/{limite} no Sienge")
-            
-            # Obtém credenciais Sienge das variáveis de ambiente
-            credenciais_sienge = {
-                "url": os.getenv("SIENGE_URL", ""),
-                "usuario": os.getenv("SIENGE_USERNAME", ""),
-                "senha": os.getenv("SIENGE_PASSWORD", "")
-            }
-            
-            resultado_sienge = await executar_processamento_sienge(
-                contrato=contrato,
-                indices_economicos=resultado_indices.dados,
-                credenciais_sienge=credenciais_sienge
-            )
-            
-            if resultado_sienge.sucesso:
+        # Credenciais montadas uma vez por workflow (invariantes entre contratos)
+        credenciais_sienge = {
+            "url": _ENV["SIENGE_URL"],
+            "usuario": _ENV["SIENGE_USERNAME"],
+            "senha": _ENV["SIENGE_PASSWORD"]
+        }
+        credenciais_sicredi = {
+            "url": _ENV["SICREDI_URL"],
+            "usuario": _ENV["SICREDI_USERNAME"],
+            "senha": _ENV["SICREDI_PASSWORD"]
+        }
+        
+        semaforo_sienge = asyncio.Semaphore(SIENGE_CONCORRENCIA)
+        
+        async def _processar_contrato(i: int, contrato: Dict[str, Any]):
+            async with semaforo_sienge:
+                logger.info("rpa.contrato", execucao_id=execucao_id, etapa="sienge", contrato=i + 1, total=limite)
+                return await executar_processamento_sienge(
+                    contrato=contrato,
+                    indices_economicos=resultado_indices.dados,
+                    credenciais_sienge=credenciais_sienge
+                )
+        
+        resultados_sienge = await asyncio.gather(
+            *(_processar_contrato(i, contrato) for i, contrato in enumerate(contratos_reajuste[:limite])),
+            return_exceptions=True
+        )
+        
+        contratos_processados = []
+        for resultado_sienge in resultados_sienge:
+            if isinstance(resultado_sienge, Exception):
+                logger.error("rpa.erro", execucao_id=execucao_id, rpa="sienge", erro=str(resultado_sienge))
+            elif resultado_sienge.sucesso:
                 contratos_processados.append(resultado_sienge.dados)
         
         execucao["etapas_concluidas"].append("processamento_sienge")
@@ -281,26 +448,30 @@ async def executar_workflow_background(execucao_id: str, parametros: ParametrosW
         # ETAPA 4: Processamento Sicredi (se houver contratos processados)
         if contratos_processados:
             execucao["etapa_atual"] = "rpa_sicredi"
-            resultados_sicredi = []
             
-            credenciais_sicredi = {
-                "url": os.getenv("SICREDI_URL", ""),
-                "usuario": os.getenv("SICREDI_USERNAME", ""),
-                "senha": os.getenv("SICREDI_PASSWORD", "")
-            }
+            semaforo_sicredi = asyncio.Semaphore(SICREDI_CONCORRENCIA)
             
-            for processamento in contratos_processados:
-                arquivo_remessa = processamento.get("carne_gerado", {}).get("nome_arquivo")
-                
-                if arquivo_remessa:
-                    resultado_sicredi = await executar_processamento_sicredi(
+            async def _processar_remessa(arquivo_remessa: str, processamento: Dict[str, Any]):
+                async with semaforo_sicredi:
+                    return await executar_processamento_sicredi(
                         arquivo_remessa=arquivo_remessa,
                         credenciais_sicredi=credenciais_sicredi,
                         dados_processamento=processamento
                     )
-                    
-                    if resultado_sicredi.sucesso:
-                        resultados_sicredi.append(resultado_sicredi.dados)
+            
+            tarefas_sicredi = []
+            for processamento in contratos_processados:
+                arquivo_remessa = processamento.get("carne_gerado", {}).get("nome_arquivo")
+                
+                if arquivo_remessa:
+                    tarefas_sicredi.append(_processar_remessa(arquivo_remessa, processamento))
+            
+            resultados_sicredi = []
+            for resultado_sicredi in await asyncio.gather(*tarefas_sicredi, return_exceptions=True):
+                if isinstance(resultado_sicredi, Exception):
+                    logger.error("rpa.erro", execucao_id=execucao_id, rpa="sicredi", erro=str(resultado_sicredi))
+                elif resultado_sicredi.sucesso:
+                    resultados_sicredi.append(resultado_sicredi.dados)
             
             execucao["etapas_concluidas"].append("processamento_sicredi")
             execucao["resultados_sicredi"] = resultados_sicredi
@@ -310,11 +481,10 @@ async def executar_workflow_background(execucao_id: str, parametros: ParametrosW
         execucao["fim"] = datetime.now().isoformat()
         execucao["mensagem"] = f"Workflow concluído com sucesso - {len(contratos_processados)} contratos processados"
         
-        logger.info(f"[{execucao_id}] Workflow concluído com sucesso")
+        logger.info("workflow.concluido", execucao_id=execucao_id)
         
     except Exception as e:
-        logger.error(f"[{execucao_id}] Erro no workflow: {str(e)}")
-        execucao = obter_execucao(execucao_id)
+        logger.error("workflow.erro", execucao_id=execucao_id, erro=str(e))
         execucao["status"] = "erro"
         execucao["erro"] = str(e)
         execucao["fim"] = datetime.now().isoformat()
@@ -342,7 +512,7 @@ async def executar_rpa_coleta_indices(parametros: ParametrosColetaIndices):
         )
         
     except Exception as e:
-        logger.error(f"Erro no RPA Coleta de Índices: {str(e)}")
+        logger.error("rpa.erro", rpa="coleta_indices", erro=str(e))
         raise HTTPException(status_code=500, detail=f"Erro interno: {str(e)}")
 
 @app.post("/rpa/analise-planilhas", response_model=RespostaAPI)
@@ -365,7 +535,7 @@ async def executar_rpa_analise_planilhas(parametros: ParametrosAnalisePlanilhas)
         )
         
     except Exception as e:
-        logger.error(f"Erro no RPA Análise de Planilhas: {str(e)}")
+        logger.error("rpa.erro", rpa="analise_planilhas", erro=str(e))
         raise HTTPException(status_code=500, detail=f"Erro interno: {str(e)}")
 
 @app.post("/rpa/sienge", response_model=RespostaAPI)
@@ -388,7 +558,7 @@ async def executar_rpa_sienge(parametros: ParametrosSienge):
         )
         
     except Exception as e:
-        logger.error(f"Erro no RPA Sienge: {str(e)}")
+        logger.error("rpa.erro", rpa="sienge", erro=str(e))
         raise HTTPException(status_code=500, detail=f"Erro interno: {str(e)}")
 
 @app.post("/rpa/sicredi", response_model=RespostaAPI)
@@ -411,27 +581,30 @@ async def executar_rpa_sicredi(parametros: ParametrosSicredi):
         )
         
     except Exception as e:
-        logger.error(f"Erro no RPA Sicredi: {str(e)}")
+        logger.error("rpa.erro", rpa="sicredi", erro=str(e))
         raise HTTPException(status_code=500, detail=f"Erro interno: {str(e)}")
 
 # ============================================================================
 # ENDPOINTS DE MONITORAMENTO
 # ============================================================================
 
-@app.get("/execucoes", response_model=RespostaAPI)
-async def listar_execucoes():
+@app.get("/execucoes")
+async def listar_execucoes(detalhes: bool = False):
     """
-    Lista todas as execuções ativas na memória
+    Lista as execuções ativas na memória (use ?detalhes=true para o conteúdo completo)
     """
-    return RespostaAPI(
-        sucesso=True,
-        mensagem=f"Total de {len(execucoes_ativas)} execuções na memória",
-        dados={
-            "total": len(execucoes_ativas),
-            "execucoes": list(execucoes_ativas.keys()),
-            "detalhes": execucoes_ativas
-        }
-    )
+    total = len(execucoes_ativas)
+    dados = {
+        "total": total,
+        "execucoes": list(execucoes_ativas)
+    }
+    if detalhes:
+        dados["detalhes"] = execucoes_ativas
+    
+    return RespostaORJSON(montar_resposta(
+        mensagem=f"Total de {total} execuções na memória",
+        dados=dados
+    ))
 
 @app.delete("/execucoes/{execucao_id}", response_model=RespostaAPI)
 async def limpar_execucao(execucao_id: str):
@@ -461,6 +634,59 @@ async def limpar_todas_execucoes():
         dados={"execucoes_removidas": total}
     )
 
+# ============================================================================
+# ROTAS RÁPIDAS (ASGI)
+# ============================================================================
+
+async def _corpo_root() -> bytes:
+    """Retorna o corpo JSON do endpoint raiz"""
+    return orjson.dumps(await root(), default=_orjson_default)
+
+# GETs de monitoramento respondidos antes do roteamento e do CORSMiddleware
+# (os cabeçalhos CORS são montados em _cabecalhos_cors; preflight OPTIONS segue pelo middleware)
+_ROTAS_RAPIDAS = {
+    "/health": _corpo_health,
+    "/": _corpo_root
+}
+
+_CABECALHOS_JSON = [(b"content-type", b"application/json")]
+
+def _cabecalhos_cors(scope) -> list:
+    """
+    Cabeçalhos CORS das rotas rápidas, iguais aos que o CORSMiddleware gera para
+    uma requisição simples (allow_origins=["*"] com credenciais: ecoa o Origin)
+    """
+    for nome, valor in scope["headers"]:
+        if nome == b"origin":
+            return [
+                (b"access-control-allow-origin", valor),
+                (b"access-control-allow-credentials", b"true"),
+                (b"vary", b"Origin")
+            ]
+    return []
+
+async def app_asgi(scope, receive, send):
+    """
+    Aplicação ASGI raiz: atende /health e / diretamente e delega o resto ao FastAPI
+    """
+    if scope["type"] == "http" and scope["method"] == "GET":
+        rota_rapida = _ROTAS_RAPIDAS.get(scope["path"])
+        if rota_rapida is not None:
+            corpo = rota_rapida()
+            if asyncio.iscoroutine(corpo):
+                corpo = await corpo
+            await send({
+                "type": "http.response.start",
+                "status": 200,
+                "headers": _CABECALHOS_JSON + _cabecalhos_cors(scope) + [
+                    (b"content-length", str(len(corpo)).encode())
+                ]
+            })
+            await send({"type": "http.response.body", "body": corpo})
+            return
+    
+    await app(scope, receive, send)
+
 # ============================================================================
 # MAIN
 # ============================================================================
@@ -474,11 +700,19 @@ def main():
     print("🌐 Documentação: http://localhost:5000/docs")
     print("=" * 60)
     
+    # uvloop + httptools; reload (dev) é incompatível com múltiplos workers.
+    # Padrão de 1 worker: execuções ativas, pool de browsers, buffers do MongoDB e
+    # semáforos são memória do processo (outro worker não enxerga a execução)
+    reload = os.getenv("API_RELOAD", "false").lower() == "true"
+    
     uvicorn.run(
-        "api_rpa:app",
+        "api_rpa:app_asgi",
         host="0.0.0.0",
         port=5000,
-        reload=True,
+        reload=reload,
+        workers=None if reload else int(os.getenv("API_WORKERS", "1")),
+        loop="uvloop",
+        http="httptools",
         log_level="info"
     )
 
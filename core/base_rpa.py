@@ -3,10 +3,12 @@ BaseRPA - Classe base para todos os RPAs do sistema
 Desenvolvido em Português Brasileiro para máxima simplicidade e manutenção
 """
 
-import structlog
+import asyncio
 from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
 from datetime import datetime
 from typing import Dict, Any, Optional, List, TYPE_CHECKING
+import functools
 import json
 import traceback
 import logging
@@ -16,57 +18,89 @@ if TYPE_CHECKING:
     from core.browser_manager import RPABrowser
 
 
+@functools.lru_cache(maxsize=None)
 def get_logger(nome: str) -> logging.Logger:
-    """Cria logger simples para RPA sem duplicação"""
+    """Cria logger simples para RPA sem duplicação (uma vez por nome)"""
     logger = logging.getLogger(nome)
 
-    # Evita duplicação - limpa handlers existentes
-    if logger.handlers:
-        logger.handlers.clear()
-
     # Evita propagação para o logger raiz (evita duplicação)
     logger.propagate = False
 
     # Adiciona apenas um handler personalizado
-    handler = logging.StreamHandler()
-    formatter = logging.Formatter(
-        '%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-    handler.setFormatter(formatter)
-    logger.addHandler(handler)
+    if not logger.handlers:
+        handler = logging.StreamHandler()
+        formatter = logging.Formatter(
+            '%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+        handler.setFormatter(formatter)
+        logger.addHandler(handler)
     logger.setLevel(logging.INFO)
 
     return logger
 
 
+# Tentar importar orjson (serialização rápida dos parâmetros no log)
+try:
+    import orjson
+    ORJSON_DISPONIVEL = True
+except ImportError:
+    ORJSON_DISPONIVEL = False
+
+# Importação do pool de browsers (uma vez, fora do caminho de execução)
+try:
+    from core.browser_manager import pool_browsers
+except ImportError:
+    pool_browsers = None
+
 # Importações para persistência
 try:
-    from core.mongodb_manager import mongodb_manager
+    from core.mongodb_manager import mongodb_manager, buffer_auditoria
     MONGODB_DISPONIVEL = True
 except ImportError:
     MONGODB_DISPONIVEL = False
 
-logger = structlog.get_logger()
 
+def _json_para_log(dados: Any) -> str:
+    """Serializa dados em JSON compacto para log"""
+    if ORJSON_DISPONIVEL:
+        return orjson.dumps(dados, default=str).decode()
+    return json.dumps(dados, ensure_ascii=False, default=str)
+
+
+async def conectar_mongodb():
+    """Abre o pool de conexões compartilhado do MongoDB (chamar no startup da aplicação)"""
+    if MONGODB_DISPONIVEL and not mongodb_manager.conectado:
+        await mongodb_manager.conectar()
 
+
+async def descarregar_auditoria():
+    """Grava auditorias pendentes no MongoDB (chamar no shutdown da aplicação)"""
+    if MONGODB_DISPONIVEL:
+        await buffer_auditoria.descarregar()
+
+
+async def desconectar_mongodb():
+    """Fecha o pool de conexões compartilhado do MongoDB (chamar no shutdown da aplicação)"""
+    if MONGODB_DISPONIVEL:
+        await mongodb_manager.desconectar()
+
+
+@dataclass(slots=True)
 class ResultadoRPA:
     """
     Resultado padronizado de execução de RPA
     """
 
-    def __init__(
-        self,
-        sucesso: bool,
-        mensagem: str,
-        dados: Optional[Dict[str, Any]] = None,
-        erro: Optional[str] = None,
-        tempo_execucao: Optional[float] = None
-    ):
-        self.sucesso = sucesso
-        self.mensagem = mensagem
-        self.dados = dados or {}
-        self.erro = erro
-        self.tempo_execucao = tempo_execucao
-        self.timestamp = datetime.now()
+    sucesso: bool
+    mensagem: str
+    dados: Optional[Dict[str, Any]] = field(default_factory=dict)
+    erro: Optional[str] = None
+    tempo_execucao: Optional[float] = None
+    timestamp: datetime = field(default_factory=datetime.now)
+
+    def __post_init__(self):
+        # Mantém compatibilidade com chamadas que passam dados=None
+        if self.dados is None:
+            self.dados = {}
 
     def para_dict(self) -> Dict[str, Any]:
         """Converte resultado para dicionário"""
@@ -123,18 +157,16 @@ class BaseRPA(ABC):
         try:
             self.logger.info("🔧 Inicializando recursos do RPA...")
 
-            # Conecta ao MongoDB se disponível
+            # Usa o cliente MongoDB compartilhado (conexão gerida pela aplicação)
             if MONGODB_DISPONIVEL:
                 self.mongo_manager = mongodb_manager
-                self.logger.info("✅ MongoDB conectado com sucesso")
 
             # Inicializa browser se necessário
             if self.usar_browser:
-                try:
-                    from core.browser_manager import RPABrowser
-                    self.browser = RPABrowser(headless=True)
-                    self.logger.info("✅ Browser Selenium inicializado")
-                except ImportError:
+                if pool_browsers is not None:
+                    self.browser = await pool_browsers.adquirir()
+                    self.logger.info("✅ Browser Selenium obtido do pool")
+                else:
                     self.logger.warning("⚠️ Browser não disponível")
                     self.browser = None
 
@@ -151,15 +183,11 @@ class BaseRPA(ABC):
         try:
             self.logger.info("🧹 Finalizando recursos do RPA...")
 
-            # Fecha browser
+            # Devolve browser ao pool
             if self.browser:
-                self.browser.close()
-                self.logger.info("✅ Browser fechado")
-
-            # Desconecta MongoDB
-            if self.mongo_manager:
-                await self.mongo_manager.disconnect()
-                self.logger.info("✅ MongoDB desconectado")
+                await pool_browsers.devolver(self.browser)
+                self.browser = None
+                self.logger.info("✅ Browser devolvido ao pool")
 
         except Exception as e:
             self.logger.error(f"⚠️ Erro na finalização: {str(e)}")
@@ -187,13 +215,16 @@ class BaseRPA(ABC):
         Returns:
             ResultadoRPA com resultado da execução
         """
+        # Wall-clock só para a auditoria; duração medida com o relógio monotônico do loop
         self.inicio_execucao = datetime.now()
+        loop = asyncio.get_running_loop()
+        t0 = loop.time()
         resultado = None
 
         try:
             self.logger.info(f"🚀 Iniciando execução do RPA: {self.nome_rpa}")
-            self.logger.info(
-                f"📋 Parâmetros: {json.dumps(parametros, indent=2, ensure_ascii=False)}")
+            if self.logger.isEnabledFor(logging.INFO):
+                self.logger.info("📋 Parâmetros: %s", _json_para_log(parametros))
 
             # Inicializa recursos
             if not await self.inicializar():
@@ -207,8 +238,7 @@ class BaseRPA(ABC):
             resultado = await self.executar(parametros)
 
             # Calcula tempo de execução
-            tempo_execucao = (
-                datetime.now() - self.inicio_execucao).total_seconds()
+            tempo_execucao = loop.time() - t0
             resultado.tempo_execucao = tempo_execucao
 
             # Log do resultado
@@ -226,11 +256,11 @@ class BaseRPA(ABC):
             return resultado
 
         except Exception as e:
-            tempo_execucao = (
-                datetime.now() - self.inicio_execucao).total_seconds()
+            tempo_execucao = loop.time() - t0
+            # Traceback formatado uma única vez: vai para o log e para o resultado
             erro_detalhado = f"{str(e)}\n{traceback.format_exc()}"
 
-            self.logger.error(f"💥 Erro inesperado no RPA: {erro_detalhado}")
+            self.logger.error("💥 Erro inesperado no RPA: %s", erro_detalhado)
 
             resultado = ResultadoRPA(
                 sucesso=False,
@@ -250,7 +280,7 @@ class BaseRPA(ABC):
 
     async def _salvar_execucao(self, parametros: Dict[str, Any], resultado: ResultadoRPA):
         """
-        Salva execução no MongoDB para auditoria
+        Enfileira execução no buffer de auditoria do MongoDB (gravação em lote)
 
         Args:
             parametros: Parâmetros de entrada
@@ -260,8 +290,6 @@ class BaseRPA(ABC):
             if not self.mongo_manager:
                 return
 
-            collection = self.mongo_manager.get_collection("execucoes_rpa")
-
             documento = {
                 "nome_rpa": self.nome_rpa,
                 "timestamp_inicio": self.inicio_execucao,
@@ -274,8 +302,7 @@ class BaseRPA(ABC):
                 "erro": resultado.erro
             }
 
-            await collection.insert_one(documento)
-            self.logger.info("💾 Execução salva no MongoDB para auditoria")
+            buffer_auditoria.adicionar(documento)
 
         except Exception as e:
             self.logger.error(f"⚠️ Erro ao salvar execução: {str(e)}")
@@ -301,8 +328,8 @@ class BaseRPA(ABC):
             mensagem: Mensagem de contexto
             erro: Exception ocorrida
         """
-        self.logger.error(f"❌ {mensagem}: {str(erro)}")
-        self.logger.error(f"🔍 Traceback: {traceback.format_exc()}")
+        # exc_info: o traceback só é formatado se algum handler emitir o registro
+        self.logger.error("❌ %s: %s", mensagem, erro, exc_info=erro)
 
     # ========== MÉTODOS DO BROWSER (DELEGATE) ==========
     # Estes métodos delegam para self.browser e aparecem no IntelliSense
@@ -330,6 +357,12 @@ class BaseRPA(ABC):
             return self.browser.find_elements(xpath, condition)
         return []
 
+    def find_many(self, xpaths: List[str], timeout: int = 10) -> List[Any]:
+        """Aguarda e encontra vários elementos, uma única chamada ao browser por tentativa (delegate para browser)"""
+        if self.browser:
+            return self.browser.find_many(xpaths, timeout)
+        return [None] * len(xpaths)
+
     def click(self, xpath: str) -> None:
         """Clica em elemento (delegate para browser)"""
         if self.browser:
@@ -379,3 +412,41 @@ class BaseRPA(ABC):
         if self.browser:
             return self.browser.on_iframe(xpath)
         return None
+
+    # ========== MÉTODOS ASSÍNCRONOS DO BROWSER ==========
+    # Mesmos delegates, executados na thread do browser sem bloquear o event loop
+
+    async def get_page_async(self, url: str) -> bool:
+        """Navega para página sem bloquear o event loop"""
+        if self.browser:
+            return await self.browser.executar_em_thread(self.browser.get_page, url)
+        return False
+
+    async def find_element_async(self, xpath: str, condition: str = "presence"):
+        """Encontra elemento sem bloquear o event loop"""
+        if self.browser:
+            return await self.browser.executar_em_thread(self.browser.find_element, xpath, condition)
+        return None
+
+    async def find_elements_async(self, xpath: str, condition: str = "located_all"):
+        """Encontra elementos sem bloquear o event loop"""
+        if self.browser:
+            return await self.browser.executar_em_thread(self.browser.find_elements, xpath, condition)
+        return []
+
+    async def click_async(self, xpath: str) -> None:
+        """Clica em elemento sem bloquear o event loop"""
+        if self.browser:
+            return await self.browser.executar_em_thread(self.browser.click, xpath)
+
+    async def send_text_async(self, xpath: str, text: str, clear: bool = False, timeout: int = 15, verify: bool = False) -> None:
+        """Envia texto para elemento sem bloquear o event loop"""
+        if self.browser:
+            return await self.browser.executar_em_thread(
+                self.browser.send_text, xpath, text, clear, timeout, verify)
+
+    async def get_text_async(self, xpath: str, timeout: int = 10) -> str:
+        """Obtém texto do elemento sem bloquear o event loop"""
+        if self.browser:
+            return await self.browser.executar_em_thread(self.browser.get_text, xpath, timeout)
+        return ""
@@ -1,80 +1,10 @@
 """
 Classe Base Simplificada para RPAs
-Versão limpa sem dependências externas complexas
+Mantido por compatibilidade: reexporta as classes de core.base_rpa
 
 Desenvolvido em Português Brasileiro
 """
 
-import asyncio
-from datetime import datetime
-from typing import Dict, Any, Optional
-import structlog
+from core.base_rpa import BaseRPA, ResultadoRPA
 
-logger = structlog.get_logger()
-
-class ResultadoRPA:
-    """
-    Classe para padronizar resultados dos RPAs
-    """
-    def __init__(
-        self, 
-        sucesso: bool, 
-        mensagem: str, 
-        dados: Optional[Dict[str, Any]] = None,
-        erro: Optional[str] = None,
-        tempo_execucao: float = 0.0
-    ):
-        self.sucesso = sucesso
-        self.mensagem = mensagem
-        self.dados = dados or {}
-        self.erro = erro
-        self.tempo_execucao = tempo_execucao
-
-class BaseRPA:
-    """
-    Classe base simplificada para todos os RPAs
-    """
-    
-    def __init__(self, nome_rpa: str, usar_browser: bool = False):
-        self.nome_rpa = nome_rpa
-        self.usar_browser = usar_browser
-        self.browser = None  # Será implementado pelo cliente
-        self.mongo_manager = None  # Opcional
-        
-    def log_progresso(self, mensagem: str):
-        """Log de progresso"""
-        logger.info(f"[{self.nome_rpa}] {mensagem}")
-        
-    def log_erro(self, mensagem: str, erro: Exception):
-        """Log de erro"""
-        logger.error(f"[{self.nome_rpa}] {mensagem}: {str(erro)}")
-        
-    async def executar_com_monitoramento(self, parametros: Dict[str, Any]) -> ResultadoRPA:
-        """
-        Executa RPA com monitoramento de tempo
-        """
-        inicio = datetime.now()
-        
-        try:
-            self.log_progresso("Iniciando execução")
-            resultado = await self.executar(parametros)
-            resultado.tempo_execucao = (datetime.now() - inicio).total_seconds()
-            self.log_progresso(f"Execução concluída em {resultado.tempo_execucao:.2f}s")
-            return resultado
-            
-        except Exception as e:
-            tempo_execucao = (datetime.now() - inicio).total_seconds()
-            self.log_erro("Erro durante execução", e)
-            
-            return ResultadoRPA(
-                sucesso=False,
-                mensagem=f"Erro no RPA {self.nome_rpa}",
-                erro=str(e),
-                tempo_execucao=tempo_execucao
-            )
-    
-    async def executar(self, parametros: Dict[str, Any]) -> ResultadoRPA:
-        """
-        Método principal que deve ser implementado pelos RPAs filhos
-        """
-        raise NotImplementedError("Método executar deve ser implementado pelo RPA específico")
\ No newline at end of file
+__all__ = ["BaseRPA", "ResultadoRPA"]
@@ -5,11 +5,15 @@ Mantém compatibilidade com sua arquitetura Firefox/Gecko
 Desenvolvido em Português Brasileiro
 """
 
+from __future__ import annotations
+
+import asyncio
+import functools
 import logging
 import os
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import contextmanager
-from time import sleep
-from typing import Iterator, List, Optional, Callable
+from typing import Any, Dict, Iterator, List, Optional, Callable
 
 # Tentar importar Selenium
 try:
@@ -34,6 +38,51 @@ try:
 except ImportError:
     SELENIUM_DISPONIVEL = False
 
+# Condições de espera por nome (montadas uma vez na importação)
+_CONDITIONS: Dict[str, Callable] = {
+    "visible": EC.visibility_of_element_located,
+    "visible_any": EC.visibility_of_any_elements_located,
+    "visible_all": EC.visibility_of_all_elements_located,
+    "clickable": EC.element_to_be_clickable,
+    "selected": EC.element_to_be_selected,
+    "located_all": EC.presence_of_all_elements_located,
+    "presence": EC.presence_of_element_located,
+} if SELENIUM_DISPONIVEL else {}
+
+
+@functools.lru_cache(maxsize=256)
+def _locator(xpath: str) -> tuple:
+    """Locator XPath reaproveitado entre chamadas"""
+    return (By.XPATH, xpath)
+
+
+@functools.lru_cache(maxsize=256)
+def _cond_for(condition: str, xpath: str) -> Callable:
+    """Condição de espera (sem estado) memorizada por nome e XPath"""
+    return _CONDITIONS.get(condition, EC.presence_of_element_located)(_locator(xpath))
+
+
+# Avalia vários XPaths no próprio browser em uma única chamada WebDriver
+_SCRIPT_FIND_MANY = (
+    "return arguments[0].map(x => document.evaluate("
+    "x, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue);"
+)
+
+@functools.lru_cache(maxsize=1)
+def _resolver_gecko_driver_path() -> str:
+    """
+    Resolve o caminho do GeckoDriver (fallback para o caminho padrão)
+    
+    Chamado na criação do primeiro browser, não na importação: a resolução
+    pode baixar o driver. O resultado fica em cache para os browsers seguintes.
+    """
+    if SELENIUM_DISPONIVEL:
+        try:
+            return GeckoDriverManager().install()
+        except Exception:
+            pass
+    return "/usr/local/bin/geckodriver"
+
 
 class WindowNotFound(Exception):
     """Browser window not found."""
@@ -45,10 +94,11 @@ class RPABrowser:
     Implementa Firefox/Gecko seguindo sua arquitetura
     """
 
-    def __init__(self, headless: bool = True, eager_load: bool = False):
+    def __init__(self, headless: bool = True, eager_load: bool = True):
         self._driver: Optional[webdriver.Firefox] = None
         self._driver_wait: Optional[WebDriverWait] = None
         self._original_timeout = 30
+        self._io_executor: Optional[ThreadPoolExecutor] = None
         self.actions = None
         self.logger = logging.getLogger("RPABrowser")
 
@@ -92,15 +142,17 @@ class RPABrowser:
         self.options.set_preference("browser.download.useDownloadDir", True)
         self.options.set_preference("pdfjs.disabled", True)
 
-        # Tentar usar GeckoDriver
-        try:
-            gecko_driver_path = GeckoDriverManager().install()
-        except Exception:
-            # Fallback para caminho padrão
-            gecko_driver_path = "/usr/local/bin/geckodriver"
+        # Perfil enxuto: RPAs só precisam do DOM. CSS é mantido porque os
+        # cliques dependem de layout (element_to_be_clickable / visibilidade)
+        self.options.set_preference("permissions.default.image", 2)
+        self.options.set_preference("media.autoplay.default", 5)
+        self.options.set_preference("toolkit.telemetry.enabled", False)
+        self.options.set_preference("datareporting.healthreport.uploadEnabled", False)
+        self.options.set_preference("browser.cache.disk.enable", False)
+        self.options.set_preference("browser.cache.memory.enable", True)
 
         self._driver = webdriver.Firefox(
-            service=Service(gecko_driver_path),
+            service=Service(_resolver_gecko_driver_path()),
             options=self.options
         )
 
@@ -135,28 +187,13 @@ class RPABrowser:
             self.logger.error(f"❌ Erro ao acessar {url}: {e}")
             return False
 
-    @staticmethod
-    def _get_condition(condition: str) -> Callable:
-        """Retorna função de condição baseada no nome"""
-        conditions = {
-            "visible": EC.visibility_of_element_located,
-            "visible_any": EC.visibility_of_any_elements_located,
-            "visible_all": EC.visibility_of_all_elements_located,
-            "clickable": EC.element_to_be_clickable,
-            "selected": EC.element_to_be_selected,
-            "located_all": EC.presence_of_all_elements_located,
-            "presence": EC.presence_of_element_located,
-        }
-        return conditions.get(condition, EC.presence_of_element_located)
-
     def find_element(self, xpath: str, condition: str = "presence") -> WebElement:
         """Aguarda e retorna elemento único"""
         if not self._driver or not self._driver_wait:
             raise NoSuchElementException("Browser não inicializado")
 
         try:
-            condition_func = self._get_condition(condition)
-            return self._driver_wait.until(condition_func((By.XPATH, xpath)))
+            return self._driver_wait.until(_cond_for(condition, xpath))
         except TimeoutException as exc:
             raise NoSuchElementException(
                 f"Elemento com xpath {xpath} não encontrado. {exc}")
@@ -167,63 +204,99 @@ class RPABrowser:
             return []
 
         try:
-            condition_func = self._get_condition(condition)
-            return self._driver_wait.until(condition_func((By.XPATH, xpath)))
+            return self._driver_wait.until(_cond_for(condition, xpath))
         except TimeoutException as exc:
             raise NoSuchElementException(
                 f"Elementos com xpath {xpath} não encontrados. {exc}")
 
+    def find_many(self, xpaths: List[str], timeout: int = 10) -> List[Optional[WebElement]]:
+        """
+        Retorna o primeiro elemento de cada XPath, buscando todos em um único
+        execute_script por tentativa. Aguarda (polling) até que todos existam ou
+        o timeout expire; nesse caso os ausentes vêm como None.
+        """
+        if not self._driver:
+            raise NoSuchElementException("Browser não inicializado")
+
+        xpaths = list(xpaths)
+        ultimo: List[Optional[WebElement]] = [None] * len(xpaths)
+
+        def _todos_presentes(driver):
+            nonlocal ultimo
+            ultimo = driver.execute_script(_SCRIPT_FIND_MANY, xpaths)
+            return ultimo if all(elemento is not None for elemento in ultimo) else False
+
+        try:
+            return WebDriverWait(self._driver, timeout, poll_frequency=0.2).until(_todos_presentes)
+        except TimeoutException:
+            return ultimo
+
     def click(self, xpath: str) -> None:
         """Clica em elemento com tratamento de erros"""
         if not self._driver:
             raise Exception("Browser não inicializado")
 
         element = self.find_element(xpath, condition="clickable")
-        self._driver.execute_script(
-            "arguments[0].scrollIntoView(true);", element)
 
+        # O WebDriver já rola até o elemento no click; o scroll via JS só é
+        # feito quando o clique é interceptado
         try:
             element.click()
-        except (ElementClickInterceptedException, ElementNotInteractableException, StaleElementReferenceException):
+        except ElementClickInterceptedException:
+            self._driver.execute_script(
+                "arguments[0].scrollIntoView(true);", element)
+            try:
+                element.click()
+            except (ElementClickInterceptedException, ElementNotInteractableException, StaleElementReferenceException):
+                self._driver.execute_script("arguments[0].click();", element)
+        except (ElementNotInteractableException, StaleElementReferenceException):
             self._driver.execute_script("arguments[0].click();", element)
 
     def get_text(self, xpath: str, timeout: int = 10) -> str:
         """Obtém texto do elemento"""
-        while timeout > 0:
-            try:
-                return self.find_element(xpath).text
-            except NoSuchElementException:
-                sleep(1)
-                timeout -= 1
-        raise NoSuchElementException(
-            f"Elemento com xpath {xpath} não encontrado.")
+        if not self._driver:
+            raise NoSuchElementException("Browser não inicializado")
+
+        try:
+            element = WebDriverWait(self._driver, timeout, poll_frequency=0.2).until(_cond_for("presence", xpath))
+            return element.text
+        except TimeoutException:
+            raise NoSuchElementException(
+                f"Elemento com xpath {xpath} não encontrado.")
 
     def send_text(self, xpath: str, text: str, clear: bool = False, timeout: int = 15, verify: bool = False) -> None:
         """Envia texto para elemento"""
-        while timeout > 0:
-            try:
-                element = self.find_element(xpath, "clickable")
-                if clear:
-                    element.clear()
-                element.send_keys(str(text))
-
-                if not verify or element.get_attribute("value") == str(text):
-                    return
+        if not self._driver:
+            raise Exception("Browser não inicializado")
 
-            except InvalidElementStateException as exc:
-                if "Element is read-only" in str(exc):
-                    if self._driver:
-                        self._driver.execute_script(
-                            "arguments[0].removeAttribute('readonly')", element)
-                    else:
-                        raise Exception("Browser não inicializado")
-                    continue
+        texto = str(text)
+        wait = WebDriverWait(self._driver, timeout, poll_frequency=0.2)
 
-            sleep(2)
-            timeout -= 1
+        try:
+            element = wait.until(_cond_for("clickable", xpath))
+        except TimeoutException:
+            raise TimeoutException(
+                f"Timeout enviando texto para elemento com xpath {xpath}")
 
-        raise TimeoutException(
-            f"Timeout enviando texto para elemento com xpath {xpath}")
+        try:
+            if clear:
+                element.clear()
+            element.send_keys(texto)
+        except InvalidElementStateException as exc:
+            if "Element is read-only" not in str(exc):
+                raise
+            self._driver.execute_script(
+                "arguments[0].removeAttribute('readonly')", element)
+            if clear:
+                element.clear()
+            element.send_keys(texto)
+
+        if verify:
+            try:
+                wait.until(EC.text_to_be_present_in_element_value(_locator(xpath), texto))
+            except TimeoutException:
+                raise TimeoutException(
+                    f"Timeout enviando texto para elemento com xpath {xpath}")
 
     def check_for_error(self, xpath: str, condition: Optional[str] = None, retry: int = 1) -> bool:
         """Verifica se elemento de erro está presente"""
@@ -243,18 +316,18 @@ class RPABrowser:
             raise Exception("Browser não inicializado")
 
         last_handle = self._driver.current_window_handle
+        existing_handles = set(self._driver.window_handles)
         self._driver.execute_script(f"window.open('{url}')")
-        new_handle = None
-
-        while not new_handle:
-            for handle in self._driver.window_handles:
-                if handle != last_handle:
-                    self._driver.switch_to.window(handle)
-                    if self._driver.current_url == url:
-                        if self._driver.execute_script("return document.readyState") == "complete":
-                            new_handle = handle
-                            break
-            sleep(1)
+
+        wait = WebDriverWait(self._driver, self._original_timeout, poll_frequency=0.25)
+        try:
+            wait.until(EC.new_window_is_opened(list(existing_handles)))
+            new_handle = (set(self._driver.window_handles) - existing_handles).pop()
+            self._driver.switch_to.window(new_handle)
+            wait.until(lambda d: d.current_url == url and
+                       d.execute_script("return document.readyState") == "complete")
+        except TimeoutException as exc:
+            raise WindowNotFound(f"Janela com URL {url} não carregou. {exc}")
 
         yield
         self._driver.close()
@@ -266,8 +339,7 @@ class RPABrowser:
         if not self._driver or not self._driver_wait:
             raise Exception("Browser não inicializado")
 
-        iframe = self._driver_wait.until(
-            EC.presence_of_element_located((By.XPATH, xpath)))
+        iframe = self._driver_wait.until(_cond_for("presence", xpath))
         self._driver.switch_to.frame(iframe)
         yield
         self._driver.switch_to.default_content()
@@ -278,8 +350,52 @@ class RPABrowser:
             return ""
         return self._driver.page_source
 
+    def reset_state(self) -> bool:
+        """
+        Limpa o estado do browser para reutilização pelo pool
+
+        Returns:
+            True se o browser continua utilizável
+        """
+        if not self._driver:
+            return False
+
+        try:
+            handles = self._driver.window_handles
+            for handle in handles[1:]:
+                self._driver.switch_to.window(handle)
+                self._driver.close()
+            self._driver.switch_to.window(handles[0])
+            self._driver.switch_to.default_content()
+            self._driver.delete_all_cookies()
+            self._driver.get("about:blank")
+            self.reset_timeout()
+            return True
+        except Exception as e:
+            self.logger.warning(f"⚠️ Browser descartado ao limpar estado: {e}")
+            return False
+
+    async def executar_em_thread(self, func: Callable, *args, **kwargs) -> Any:
+        """
+        Executa um método bloqueante do browser fora do event loop
+
+        Cada browser tem um executor de 1 thread: as chamadas ao WebDriver
+        continuam serializadas, mas o loop asyncio fica livre.
+        """
+        if self._io_executor is None:
+            self._io_executor = ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix="RPABrowser")
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._io_executor, functools.partial(func, *args, **kwargs))
+
     def close(self):
         """Fecha o browser"""
+        if self._io_executor is not None:
+            self._io_executor.shutdown(wait=False)
+            self._io_executor = None
+
         if self._driver:
             try:
                 self._driver.quit()
@@ -293,3 +409,73 @@ class RPABrowser:
     def __del__(self):
         """Destrutor - garante que browser seja fechado"""
         self.close()
+
+
+class PoolBrowsers:
+    """
+    Pool de browsers Firefox reaproveitados entre execuções de RPAs
+
+    Cria browsers sob demanda até `tamanho` instâncias; ao devolver, o estado
+    (cookies, janelas extras, iframe, timeout) é limpo e o browser volta ao pool.
+    A capacidade é um semáforo: cada browser em uso ocupa uma vaga, liberada ao
+    devolvê-lo (reaproveitado ou descartado), o que acorda quem aguarda.
+    """
+
+    def __init__(self, tamanho: int = 4, headless: bool = True):
+        self.tamanho = tamanho
+        self.headless = headless
+        self._fila: Optional[asyncio.Queue] = None
+        self._vagas: Optional[asyncio.Semaphore] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.logger = logging.getLogger("PoolBrowsers")
+
+    def _garantir_fila(self):
+        """Recria a fila e as vagas se o event loop mudou (ex.: asyncio.run por execução)"""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            if self._fila is not None:
+                while not self._fila.empty():
+                    self._fila.get_nowait().close()
+            self._fila = asyncio.Queue()
+            self._vagas = asyncio.Semaphore(self.tamanho)
+            self._loop = loop
+
+    async def adquirir(self) -> RPABrowser:
+        """Obtém um browser livre, criando um novo se não houver ocioso (aguarda vaga com o pool cheio)"""
+        self._garantir_fila()
+        await self._vagas.acquire()
+
+        if not self._fila.empty():
+            return self._fila.get_nowait()
+
+        try:
+            return await asyncio.to_thread(RPABrowser, self.headless)
+        except BaseException:
+            self._vagas.release()
+            raise
+
+    async def devolver(self, browser: RPABrowser):
+        """Devolve o browser ao pool (ou o descarta se não puder ser reutilizado)"""
+        self._garantir_fila()
+
+        try:
+            if await browser.executar_em_thread(browser.reset_state):
+                self._fila.put_nowait(browser)
+            else:
+                browser.close()
+        finally:
+            # Descartado ou não, a vaga volta: o próximo adquirir cria outro browser
+            self._vagas.release()
+
+    async def fechar(self):
+        """Fecha todos os browsers ociosos do pool"""
+        if self._fila is None:
+            return
+
+        while not self._fila.empty():
+            browser = self._fila.get_nowait()
+            await asyncio.to_thread(browser.close)
+
+
+# Pool global de browsers (tamanho alinhado à concorrência dos RPAs)
+pool_browsers = PoolBrowsers(tamanho=int(os.getenv("RPA_BROWSER_POOL", "4")))
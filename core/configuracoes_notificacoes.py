@@ -0,0 +1,52 @@
+"""
+Configurações de Notificações
+Leitura e gravação do arquivo de configurações das notificações,
+compartilhadas pelo sistema completo e pelo sistema simples
+
+Desenvolvido em Português Brasileiro
+"""
+
+import os
+import json
+import functools
+from typing import Dict, Any
+
+# Tentar importar orjson (serialização rápida)
+try:
+    import orjson
+    ORJSON_DISPONIVEL = True
+except ImportError:
+    ORJSON_DISPONIVEL = False
+
+# Arquivo de configurações das notificações
+ARQUIVO_CONFIGURACOES = 'config/notificacoes.json'
+
+# Desserialização: orjson aceita bytes diretamente
+_desserializar = orjson.loads if ORJSON_DISPONIVEL else json.loads
+
+
+def serializar_configuracoes(dados: Dict[str, Any]) -> bytes:
+    """Serializa as configurações em JSON indentado (UTF-8, sem escapes ASCII)"""
+    if ORJSON_DISPONIVEL:
+        return orjson.dumps(dados, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(dados, indent=2, ensure_ascii=False).encode('utf-8')
+
+
+@functools.lru_cache(maxsize=4)
+def ler_configuracoes_arquivo(caminho: str, mtime_ns: int, tamanho: int) -> Dict[str, Any]:
+    """
+    Lê o JSON de configurações; em cache enquanto mtime e tamanho do arquivo não mudarem
+
+    O dict retornado é compartilhado pelo cache: quem for alterá-lo deve copiá-lo.
+    """
+    with open(caminho, 'rb') as f:
+        return _desserializar(f.read())
+
+
+def gravar_configuracoes_arquivo(caminho: str, dados: bytes):
+    """Grava as configurações serializadas (escrita atômica: temporário + replace)"""
+    os.makedirs(os.path.dirname(caminho), exist_ok=True)
+    caminho_tmp = f"{caminho}.{os.getpid()}.tmp"
+    with open(caminho_tmp, 'wb') as f:
+        f.write(dados)
+    os.replace(caminho_tmp, caminho)
@@ -8,9 +8,29 @@ Desenvolvido em Português Brasileiro
 import asyncio
 import json
 import os
-from datetime import datetime, timedelta
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import date, datetime
 from typing import Dict, Any, List, Optional
 import logging
+import time
+
+from core.registros import ExecucaoRPA
+
+# Tentar importar fcntl (travas de arquivo entre processos; indisponível no Windows)
+try:
+    import fcntl
+    FCNTL_DISPONIVEL = True
+except ImportError:
+    FCNTL_DISPONIVEL = False
+
+# Tentar importar orjson (serialização rápida)
+try:
+    import orjson
+    ORJSON_DISPONIVEL = True
+except ImportError:
+    ORJSON_DISPONIVEL = False
 
 # Tentar importar MongoDB
 try:
@@ -21,6 +41,94 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
+# Histórico JSONL: quantas execuções manter e tamanho que dispara a compactação
+LIMITE_HISTORICO_JSON = 200
+TAMANHO_COMPACTACAO_BYTES = 1_000_000
+
+# Fila de escrita em background: capacidade e tamanho máximo de cada lote
+TAMANHO_FILA_ESCRITA = 1024
+TAMANHO_LOTE_ESCRITA = 64
+
+# Validade (segundos) das estatísticas calculadas a partir do JSON
+TTL_ESTATISTICAS_JSON = 5.0
+
+def _serializar_linha(registro: Any) -> bytes:
+    """Serializa um registro (dict ou ExecucaoRPA) como uma linha JSONL (bytes)"""
+    if ORJSON_DISPONIVEL:
+        # orjson serializa dataclasses com slots nativamente
+        return orjson.dumps(registro, default=str,
+                            option=orjson.OPT_NON_STR_KEYS | orjson.OPT_APPEND_NEWLINE)
+    if isinstance(registro, ExecucaoRPA):
+        registro = registro.para_dict()
+    return json.dumps(registro, ensure_ascii=False, default=str).encode('utf-8') + b"\n"
+
+def _serializar_indentado(dados: Any) -> bytes:
+    """Serializa dados em JSON indentado (bytes)"""
+    if ORJSON_DISPONIVEL:
+        return orjson.dumps(dados, default=str,
+                            option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(dados, indent=2, ensure_ascii=False, default=str).encode('utf-8')
+
+# Dict vazio compartilhado como default de .get() (evita criar {} a cada acesso; nunca modificar)
+_VAZIO: Dict[str, Any] = {}
+
+# json.loads também aceita bytes; orjson é usado quando disponível
+_desserializar = orjson.loads if ORJSON_DISPONIVEL else json.loads
+
+@contextmanager
+def _trava_historico(arquivo: str, exclusiva: bool):
+    """
+    Trava entre processos do histórico: escritas usam trava compartilhada
+    (não se serializam entre si); só a compactação usa a exclusiva
+    """
+    if not FCNTL_DISPONIVEL:
+        yield
+        return
+    
+    fd = os.open(f"{arquivo}.lock", os.O_WRONLY | os.O_CREAT, 0o644)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX if exclusiva else fcntl.LOCK_SH)
+        yield
+    finally:
+        os.close(fd)
+
+def anexar_historico(arquivo: str, linhas: bytes):
+    """
+    Acrescenta linhas JSONL no histórico de execuções
+    
+    Único caminho de escrita do histórico (DataManagerHibrido e agendador):
+    todos os processos compartilham a mesma trava e a mesma retenção.
+    """
+    # O_APPEND + um único write(2): o kernel posiciona cada escrita no
+    # fim do arquivo, então processos concorrentes não sobrescrevem linhas
+    with _trava_historico(arquivo, exclusiva=False):
+        fd = os.open(arquivo, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+        try:
+            os.write(fd, linhas)
+            tamanho = os.fstat(fd).st_size
+        finally:
+            os.close(fd)
+    
+    # Compacta só quando o arquivo cresce além do limite
+    if tamanho > TAMANHO_COMPACTACAO_BYTES:
+        _compactar_historico(arquivo)
+
+def _compactar_historico(arquivo: str):
+    """Reescreve o histórico mantendo apenas as últimas LIMITE_HISTORICO_JSON linhas"""
+    with _trava_historico(arquivo, exclusiva=True):
+        # Outro processo pode ter compactado enquanto aguardávamos a trava
+        if os.path.getsize(arquivo) <= TAMANHO_COMPACTACAO_BYTES:
+            return
+        
+        with open(arquivo, 'rb') as f:
+            ultimas = deque(f, maxlen=LIMITE_HISTORICO_JSON)
+        
+        # Troca atômica: leitores veem o arquivo antigo ou o novo, nunca parcial
+        arquivo_temp = f"{arquivo}.{os.getpid()}.tmp"
+        with open(arquivo_temp, 'wb') as f:
+            f.writelines(ultimas)
+        os.replace(arquivo_temp, arquivo)
+
 class DataManagerHibrido:
     """
     Gerenciador de dados híbrido que mantém simplicidade do JSON
@@ -29,8 +137,19 @@ class DataManagerHibrido:
     
     def __init__(self):
         self.pasta_logs = "logs"
-        self.arquivo_historico = os.path.join(self.pasta_logs, "historico_execucoes.json")
+        self.arquivo_historico = os.path.join(self.pasta_logs, "historico_execucoes.jsonl")
         self.mongodb_ativo = False
+        # Pool dedicado para I/O de arquivo (não disputa o executor padrão do loop)
+        self._io_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="datamgr-io")
+        # Escritor em background do histórico JSON (criado em inicializar)
+        self._fila_escrita: Optional[asyncio.Queue] = None
+        self._tarefa_escrita: Optional[asyncio.Task] = None
+        # Cache do histórico lido, invalidado pela assinatura (mtime, tamanho) do arquivo
+        self._cache_historico: List[Dict[str, Any]] = []
+        self._cache_historico_assinatura: Optional[tuple] = None
+        # Cache das estatísticas JSON com validade por tempo
+        self._cache_estatisticas: Optional[Dict[str, Any]] = None
+        self._cache_estatisticas_expira = 0.0
         self._garantir_pasta_logs()
     
     def _garantir_pasta_logs(self):
@@ -52,18 +171,58 @@ class DataManagerHibrido:
                 self.mongodb_ativo = False
         else:
             logger.info("📄 Sistema simplificado: Apenas JSON")
+        
+        # Histórico JSON é gravado em lotes por uma tarefa em background
+        if self._tarefa_escrita is None or self._tarefa_escrita.done():
+            self._fila_escrita = asyncio.Queue(maxsize=TAMANHO_FILA_ESCRITA)
+            self._tarefa_escrita = asyncio.create_task(self._loop_escrita())
+    
+    async def encerrar(self):
+        """Grava o histórico pendente e encerra o escritor em background"""
+        if self._tarefa_escrita is None or self._tarefa_escrita.done():
+            return
+        
+        await self._fila_escrita.put(None)
+        await self._tarefa_escrita
+        self._tarefa_escrita = None
+    
+    async def descarregar(self):
+        """Aguarda até que todas as execuções enfileiradas sejam gravadas"""
+        if self._tarefa_escrita is not None and not self._tarefa_escrita.done():
+            await self._fila_escrita.join()
+    
+    async def _loop_escrita(self):
+        """Consome a fila e grava as execuções em lotes com um único append"""
+        fila = self._fila_escrita
+        encerrar = False
+        
+        while not encerrar:
+            lote = [await fila.get()]
+            try:
+                while len(lote) < TAMANHO_LOTE_ESCRITA:
+                    lote.append(fila.get_nowait())
+            except asyncio.QueueEmpty:
+                pass
+            
+            # None é a sentinela de encerramento
+            registros = [item for item in lote if item is not None]
+            encerrar = len(registros) != len(lote)
+            
+            try:
+                if registros:
+                    await self._executar_io(self._anexar_lote_sync, registros)
+            except Exception as e:
+                logger.error(f"❌ Falha ao gravar lote do histórico JSON: {str(e)}")
+            finally:
+                for _ in lote:
+                    fila.task_done()
     
     async def salvar_execucao(self, nome_rpa: str, parametros: Dict[str, Any], 
                              resultado: Dict[str, Any]) -> bool:
         """
         Salva execução usando sistema híbrido
         """
-        dados_execucao = {
-            "nome_rpa": nome_rpa,
-            "timestamp": datetime.now().isoformat(),
-            "parametros": parametros,
-            "resultado": resultado
-        }
+        dados_execucao = ExecucaoRPA(datetime.now(), nome_rpa, parametros, resultado)
         
         sucesso_mongodb = False
         sucesso_json = False
@@ -71,15 +230,19 @@ class DataManagerHibrido:
         # Tentar MongoDB primeiro (se disponível)
         if self.mongodb_ativo:
             try:
-                await mongodb_manager.salvar_execucao_rpa(nome_rpa, parametros, resultado)
+                await mongodb_manager.salvar_registro_execucao(dados_execucao)
                 sucesso_mongodb = True
                 logger.debug(f"💾 [{nome_rpa}] Salvo no MongoDB")
             except Exception as e:
                 logger.warning(f"⚠️ [{nome_rpa}] Falha MongoDB: {str(e)}")
         
-        # Sempre salvar em JSON (fallback garantido)
+        # Sempre salvar em JSON (fallback garantido): enfileira se o escritor
+        # em background estiver ativo, senão grava direto
         try:
-            await self._salvar_json(dados_execucao)
+            if self._tarefa_escrita is not None and not self._tarefa_escrita.done():
+                await self._fila_escrita.put(dados_execucao)
+            else:
+                await self._salvar_json(dados_execucao)
             sucesso_json = True
             logger.debug(f"📄 [{nome_rpa}] Salvo em JSON")
         except Exception as e:
@@ -87,26 +250,19 @@ class DataManagerHibrido:
         
         return sucesso_mongodb or sucesso_json
     
-    async def _salvar_json(self, dados_execucao: Dict[str, Any]):
-        """Salva dados em arquivo JSON"""
+    async def _executar_io(self, funcao, *args):
+        """Executa função de I/O bloqueante no pool dedicado, sem travar o event loop"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._io_executor, funcao, *args)
+    
+    async def _salvar_json(self, dados_execucao: ExecucaoRPA):
+        """Acrescenta a execução no histórico JSONL (em thread)"""
+        await self._executar_io(self._anexar_lote_sync, [dados_execucao])
+    
+    def _anexar_lote_sync(self, lote: List[ExecucaoRPA]):
+        """Acrescenta as execuções do lote como linhas do histórico JSONL"""
         try:
-            # Carregar histórico existente
-            historico = []
-            if os.path.exists(self.arquivo_historico):
-                with open(self.arquivo_historico, 'r', encoding='utf-8') as f:
-                    historico = json.load(f)
-            
-            # Adicionar nova execução
-            historico.append(dados_execucao)
-            
-            # Manter apenas últimas 200 execuções
-            if len(historico) > 200:
-                historico = historico[-200:]
-            
-            # Salvar arquivo
-            with open(self.arquivo_historico, 'w', encoding='utf-8') as f:
-                json.dump(historico, f, indent=2, ensure_ascii=False)
-                
+            anexar_historico(self.arquivo_historico, b"".join(_serializar_linha(dados) for dados in lote))
         except Exception as e:
             raise Exception(f"Erro ao salvar JSON: {str(e)}")
     
@@ -125,16 +281,35 @@ class DataManagerHibrido:
         return await self._obter_execucoes_json(limite)
     
     async def _obter_execucoes_json(self, limite: int = 30) -> List[Dict[str, Any]]:
+        """Lê execuções do arquivo JSON (em thread)"""
+        return await self._executar_io(self._obter_execucoes_json_sync, limite)
+    
+    def _obter_execucoes_json_sync(self, limite: int = 30) -> List[Dict[str, Any]]:
         """Lê execuções do arquivo JSON"""
         try:
-            if not os.path.exists(self.arquivo_historico):
+            try:
+                st = os.stat(self.arquivo_historico)
+            except FileNotFoundError:
                 return []
             
-            with open(self.arquivo_historico, 'r', encoding='utf-8') as f:
-                historico = json.load(f)
+            # Arquivo inalterado desde a última leitura: usa o cache
+            assinatura = (st.st_mtime_ns, st.st_size)
+            usar_cache = limite <= LIMITE_HISTORICO_JSON
+            if usar_cache and assinatura == self._cache_historico_assinatura:
+                return self._cache_historico[-limite:]
+            
+            # Mantém em memória apenas as últimas linhas
+            with open(self.arquivo_historico, 'rb') as f:
+                ultimas = deque((linha for linha in f if linha.strip()),
+                                maxlen=LIMITE_HISTORICO_JSON if usar_cache else limite)
+            
+            execucoes = [_desserializar(linha) for linha in ultimas]
             
-            # Retornar últimas execuções
-            return historico[-limite:] if len(historico) > limite else historico
+            if usar_cache:
+                self._cache_historico = execucoes
+                self._cache_historico_assinatura = assinatura
+                return execucoes[-limite:]
+            return execucoes
             
         except Exception as e:
             logger.error(f"❌ Erro ao ler JSON: {str(e)}")
@@ -154,7 +329,11 @@ class DataManagerHibrido:
         return await self._calcular_estatisticas_json()
     
     async def _calcular_estatisticas_json(self) -> Dict[str, Any]:
-        """Calcula estatísticas dos dados JSON"""
+        """Calcula estatísticas dos dados JSON (memorizadas por TTL_ESTATISTICAS_JSON)"""
+        agora = time.monotonic()
+        if self._cache_estatisticas is not None and agora < self._cache_estatisticas_expira:
+            return self._cache_estatisticas
+        
         try:
             execucoes = await self._obter_execucoes_json(100)  # Últimas 100
             
@@ -166,23 +345,25 @@ class DataManagerHibrido:
                     "contratos_processados_mes": 0
                 }
             
-            total_execucoes = len(execucoes)
+            # Uma única passada com acumuladores locais (sem dicts vazios temporários)
+            hoje = date.today().isoformat()
+            total_execucoes = execucoes_hoje = sucessos = contratos = 0
             
-            # Execuções hoje
-            hoje = datetime.now().strftime('%Y-%m-%d')
-            execucoes_hoje = sum(1 for ex in execucoes 
-                               if ex.get('timestamp', '').startswith(hoje))
+            for ex in execucoes:
+                total_execucoes += 1
+                obter = ex.get
+                
+                if obter('timestamp', '').startswith(hoje):
+                    execucoes_hoje += 1
+                
+                resultado = obter('resultado', _VAZIO)
+                if resultado.get('sucesso'):
+                    sucessos += 1
+                contratos += resultado.get('dados', _VAZIO).get('contratos_identificados', 0)
             
-            # Taxa de sucesso
-            sucessos = sum(1 for ex in execucoes 
-                          if ex.get('resultado', {}).get('sucesso', False))
             taxa_sucesso = (sucessos / total_execucoes * 100) if total_execucoes > 0 else 0
             
-            # Contratos processados (estimativa)
-            contratos = sum(ex.get('resultado', {}).get('dados', {}).get('contratos_identificados', 0) 
-                          for ex in execucoes)
-            
-            return {
+            estatisticas = {
                 "total_execucoes": total_execucoes,
                 "execucoes_hoje": execucoes_hoje,
                 "taxa_sucesso": round(taxa_sucesso, 1),
@@ -190,6 +371,10 @@ class DataManagerHibrido:
                 "fonte_dados": "JSON" if not self.mongodb_ativo else "MongoDB"
             }
             
+            self._cache_estatisticas = estatisticas
+            self._cache_estatisticas_expira = agora + TTL_ESTATISTICAS_JSON
+            return estatisticas
+            
         except Exception as e:
             logger.error(f"❌ Erro ao calcular estatísticas: {str(e)}")
             return {}
@@ -210,8 +395,8 @@ class DataManagerHibrido:
             # Carregar histórico
             historico_indices = []
             if os.path.exists(arquivo_indices):
-                with open(arquivo_indices, 'r', encoding='utf-8') as f:
-                    historico_indices = json.load(f)
+                with open(arquivo_indices, 'rb') as f:
+                    historico_indices = _desserializar(f.read())
             
             # Adicionar novos dados
             entrada = {
@@ -225,8 +410,8 @@ class DataManagerHibrido:
                 historico_indices = historico_indices[-50:]
             
             # Salvar
-            with open(arquivo_indices, 'w', encoding='utf-8') as f:
-                json.dump(historico_indices, f, indent=2, ensure_ascii=False)
+            with open(arquivo_indices, 'wb') as f:
+                f.write(_serializar_indentado(historico_indices))
             
             return True
             
@@ -242,6 +427,10 @@ async def inicializar_sistema_dados():
     """Inicializa sistema de dados"""
     await data_manager.inicializar()
 
+async def encerrar_sistema_dados():
+    """Grava o histórico pendente e encerra o sistema de dados (chamar no shutdown)"""
+    await data_manager.encerrar()
+
 async def salvar_execucao_rpa(nome_rpa: str, parametros: Dict[str, Any], 
                              resultado: Dict[str, Any]) -> bool:
     """Salva execução de RPA"""
@@ -6,15 +6,48 @@ Desenvolvido em Português Brasileiro
 """
 
 import asyncio
-from datetime import datetime
+import random
+import time
+from collections import deque
+from datetime import datetime, timedelta
 from typing import Dict, Any, List, Optional
 import logging
 from motor.motor_asyncio import AsyncIOMotorClient
 import pymongo
+from bson import ObjectId
+from pymongo.write_concern import WriteConcern
 import json
 
+from core.registros import ExecucaoRPA
+
 logger = logging.getLogger(__name__)
 
+# Auditoria é best-effort: grava sem aguardar confirmação do servidor
+WRITE_CONCERN_AUDITORIA = WriteConcern(w=0, j=False)
+
+# Configuração do pool de conexões do cliente compartilhado
+OPCOES_POOL_MONGODB = {
+    "maxPoolSize": 50,
+    "minPoolSize": 5,
+    "maxIdleTimeMS": 60000,
+    "serverSelectionTimeoutMS": 3000,
+    "socketTimeoutMS": 10000,
+    "connectTimeoutMS": 3000,
+    "retryWrites": True,
+    "appname": "rpa_reparcelamento",
+}
+
+# Espera (segundos) entre tentativas de reconexão: inicial e máxima (dobra a cada falha)
+ESPERA_RECONEXAO_INICIAL = 1.0
+ESPERA_RECONEXAO_MAXIMA = 30.0
+
+# Máximo de auditorias retidas em memória enquanto o MongoDB está indisponível
+# (acima disso as mais antigas são descartadas)
+LIMITE_AUDITORIAS_PENDENTES = 10_000
+
+# Validade (segundos) das estatísticas do dashboard em cache
+TTL_ESTATISTICAS_DASHBOARD = 5.0
+
 class MongoDBManager:
     """
     Gerenciador MongoDB para persistência dos dados dos RPAs
@@ -25,31 +58,64 @@ class MongoDBManager:
         self.database_name = "rpa_reparcelamento"
         self.client = None
         self.database = None
+        self.collection_auditoria = None
         self.conectado = False
+        # Reconexão única por vez, com backoff exponencial entre falhas
+        self._lock_conexao = asyncio.Lock()
+        self._proxima_reconexao = 0.0
+        self._espera_reconexao = ESPERA_RECONEXAO_INICIAL
+        # Cache (instante, estatísticas) do dashboard; o lock garante uma única consulta por vez
+        self._cache_estatisticas: Optional[tuple] = None
+        self._lock_estatisticas = asyncio.Lock()
     
     async def conectar(self) -> bool:
         """
-        Conecta ao MongoDB
+        Conecta ao MongoDB (cliente único com pool; reaproveitado entre chamadas)
+        
+        Durante o backoff após uma falha retorna False imediatamente, para que
+        o chamador siga pelo fallback JSON sem nova tentativa de conexão.
         """
-        try:
-            self.client = AsyncIOMotorClient(self.connection_string)
-            self.database = self.client[self.database_name]
-            
-            # Teste de conexão
-            await self.client.admin.command('ismaster')
-            
-            self.conectado = True
-            logger.info("✅ Conectado ao MongoDB com sucesso")
-            
-            # Criar índices necessários
-            await self._criar_indices()
-            
+        if self.conectado:
             return True
-            
-        except Exception as e:
-            logger.error(f"❌ Erro ao conectar MongoDB: {str(e)}")
-            self.conectado = False
+        if time.monotonic() < self._proxima_reconexao:
             return False
+        
+        async with self._lock_conexao:
+            # Outra corrotina pode ter conectado (ou falhado) enquanto aguardávamos
+            if self.conectado:
+                return True
+            if time.monotonic() < self._proxima_reconexao:
+                return False
+            
+            try:
+                if self.client is None:
+                    self.client = AsyncIOMotorClient(self.connection_string, **OPCOES_POOL_MONGODB)
+                self.database = self.client[self.database_name]
+                self.collection_auditoria = self.database.get_collection(
+                    "execucoes_rpa", write_concern=WRITE_CONCERN_AUDITORIA
+                )
+                
+                # Teste de conexão
+                await self.client.admin.command('hello')
+                
+                self.conectado = True
+                self._espera_reconexao = ESPERA_RECONEXAO_INICIAL
+                logger.info("✅ Conectado ao MongoDB com sucesso")
+                
+                # Criar índices necessários
+                await self._criar_indices()
+                
+                return True
+                
+            except Exception as e:
+                # Jitter evita que vários workers tentem reconectar no mesmo instante
+                espera = self._espera_reconexao * random.uniform(0.8, 1.2)
+                self._proxima_reconexao = time.monotonic() + espera
+                self._espera_reconexao = min(self._espera_reconexao * 2, ESPERA_RECONEXAO_MAXIMA)
+                
+                logger.error(f"❌ Erro ao conectar MongoDB (nova tentativa em {espera:.1f}s): {str(e)}")
+                self.conectado = False
+                return False
     
     async def _criar_indices(self):
         """
@@ -62,6 +128,12 @@ class MongoDBManager:
                 ("timestamp_inicio", pymongo.DESCENDING)
             ])
             
+            # Cobre o $match + $group da taxa de sucesso do dashboard
+            await self.database.execucoes_rpa.create_index([
+                ("timestamp_inicio", pymongo.DESCENDING),
+                ("sucesso", pymongo.ASCENDING)
+            ])
+            
             # Índices para contratos
             await self.database.contratos_processados.create_index([
                 ("numero_titulo", pymongo.ASCENDING),
@@ -80,33 +152,36 @@ class MongoDBManager:
             logger.error(f"⚠️ Erro ao criar índices: {str(e)}")
     
     async def salvar_execucao_rpa(self, nome_rpa: str, parametros: Dict[str, Any], 
-                                 resultado: Dict[str, Any]) -> str:
+                                 resultado: Dict[str, Any], agora: Optional[datetime] = None) -> str:
         """
         Salva execução de RPA no MongoDB
         
+        Args:
+            agora: Instante do registro (reaproveitado do chamador quando informado)
+        
         Returns:
             ID da execução salva
         """
-        if not self.conectado:
-            await self.conectar()
+        execucao = ExecucaoRPA(agora or datetime.now(), nome_rpa, parametros, resultado)
+        return await self.salvar_registro_execucao(execucao)
+    
+    async def salvar_registro_execucao(self, execucao: ExecucaoRPA) -> str:
+        """
+        Salva um registro de execução já montado no MongoDB
         
+        O documento entra no buffer de auditoria (gravação em lote, w=0) e a
+        chamada retorna na hora, sem aguardar a escrita.
+        
+        Returns:
+            ID atribuído à execução (gerado no cliente; não confirma a gravação)
+        """
         try:
-            documento = {
-                "nome_rpa": nome_rpa,
-                "timestamp_inicio": datetime.now(),
-                "timestamp_fim": datetime.now(),
-                "parametros_entrada": parametros,
-                "resultado": resultado,
-                "sucesso": resultado.get("sucesso", False),
-                "tempo_execucao_segundos": resultado.get("tempo_execucao", 0),
-                "mensagem": resultado.get("mensagem", ""),
-                "erro": resultado.get("erro", None)
-            }
-            
-            result = await self.database.execucoes_rpa.insert_one(documento)
+            documento = execucao.para_documento()
+            documento["_id"] = ObjectId()
+            buffer_auditoria.adicionar(documento)
             
-            logger.info(f"💾 Execução {nome_rpa} salva no MongoDB: {result.inserted_id}")
-            return str(result.inserted_id)
+            logger.debug(f"💾 Execução {execucao.nome_rpa} enfileirada para o MongoDB: {documento['_id']}")
+            return str(documento["_id"])
             
         except Exception as e:
             logger.error(f"❌ Erro ao salvar execução: {str(e)}")
@@ -120,21 +195,31 @@ class MongoDBManager:
             await self.conectar()
         
         try:
-            cursor = self.database.execucoes_rpa.find().sort(
+            # _id descartado no servidor; documentos buscados em um único lote
+            cursor = self.database.execucoes_rpa.find({}, projection={"_id": 0}).sort(
                 "timestamp_inicio", pymongo.DESCENDING
-            ).limit(limite)
+            ).limit(limite).batch_size(limite)
             
-            execucoes = []
-            async for doc in cursor:
-                doc["_id"] = str(doc["_id"])  # Converter ObjectId para string
-                execucoes.append(doc)
-            
-            return execucoes
+            return await cursor.to_list(length=limite)
             
         except Exception as e:
             logger.error(f"❌ Erro ao obter execuções: {str(e)}")
             return []
     
+    @staticmethod
+    def _documento_indice(tipo_indice: str, dados_indice: Dict[str, Any], agora: datetime) -> Dict[str, Any]:
+        """
+        Monta documento de índice econômico (mesmo schema para IPCA e IGPM)
+        """
+        return {
+            "tipo_indice": tipo_indice,
+            "valor": dados_indice["valor"],
+            "fonte": dados_indice["fonte"],
+            "data_coleta": agora,
+            "periodo": "acumulado_12_meses",
+            "metodo_coleta": dados_indice.get("metodo", "webscraping")
+        }
+    
     async def salvar_indices_economicos(self, indices_data: Dict[str, Any]) -> str:
         """
         Salva índices econômicos coletados
@@ -143,29 +228,16 @@ class MongoDBManager:
             await self.conectar()
         
         try:
-            # Salvar IPCA
-            if "ipca" in indices_data:
-                doc_ipca = {
-                    "tipo_indice": "IPCA",
-                    "valor": indices_data["ipca"]["valor"],
-                    "fonte": indices_data["ipca"]["fonte"],
-                    "data_coleta": datetime.now(),
-                    "periodo": "acumulado_12_meses",
-                    "metodo_coleta": indices_data["ipca"].get("metodo", "webscraping")
-                }
-                await self.database.indices_economicos.insert_one(doc_ipca)
+            agora = datetime.now()
+            documentos = [
+                self._documento_indice(tipo_indice, indices_data[chave], agora)
+                for chave, tipo_indice in (("ipca", "IPCA"), ("igpm", "IGPM"))
+                if chave in indices_data
+            ]
             
-            # Salvar IGPM
-            if "igpm" in indices_data:
-                doc_igpm = {
-                    "tipo_indice": "IGPM",
-                    "valor": indices_data["igpm"]["valor"],
-                    "fonte": indices_data["igpm"]["fonte"],
-                    "data_coleta": datetime.now(),
-                    "periodo": "acumulado_12_meses",
-                    "metodo_coleta": indices_data["igpm"].get("metodo", "webscraping")
-                }
-                await self.database.indices_economicos.insert_one(doc_igpm)
+            # IPCA e IGPM gravados em um único lote
+            if documentos:
+                await self.database.indices_economicos.insert_many(documentos, ordered=False)
             
             logger.info("💾 Índices econômicos salvos no MongoDB")
             return "success"
@@ -184,27 +256,11 @@ class MongoDBManager:
         try:
             data_limite = datetime.now() - timedelta(days=dias)
             
-            # IPCA
-            cursor_ipca = self.database.indices_economicos.find({
-                "tipo_indice": "IPCA",
-                "data_coleta": {"$gte": data_limite}
-            }).sort("data_coleta", pymongo.DESCENDING)
-            
-            ipca_historico = []
-            async for doc in cursor_ipca:
-                doc["_id"] = str(doc["_id"])
-                ipca_historico.append(doc)
-            
-            # IGPM
-            cursor_igpm = self.database.indices_economicos.find({
-                "tipo_indice": "IGPM", 
-                "data_coleta": {"$gte": data_limite}
-            }).sort("data_coleta", pymongo.DESCENDING)
-            
-            igpm_historico = []
-            async for doc in cursor_igpm:
-                doc["_id"] = str(doc["_id"])
-                igpm_historico.append(doc)
+            # IPCA e IGPM consultados em paralelo
+            ipca_historico, igpm_historico = await asyncio.gather(
+                self._listar_indices("IPCA", data_limite),
+                self._listar_indices("IGPM", data_limite)
+            )
             
             return {
                 "ipca": ipca_historico,
@@ -215,6 +271,17 @@ class MongoDBManager:
             logger.error(f"❌ Erro ao obter histórico: {str(e)}")
             return {"ipca": [], "igpm": []}
     
+    async def _listar_indices(self, tipo_indice: str, data_limite: datetime) -> List[Dict[str, Any]]:
+        """
+        Lista registros de um índice a partir da data limite (mais recentes primeiro)
+        """
+        cursor = self.database.indices_economicos.find({
+            "tipo_indice": tipo_indice,
+            "data_coleta": {"$gte": data_limite}
+        }, projection={"_id": 0}).sort("data_coleta", pymongo.DESCENDING)
+        
+        return await cursor.to_list(length=None)
+    
     async def salvar_contrato_processado(self, contrato_data: Dict[str, Any]) -> str:
         """
         Salva dados de contrato processado
@@ -253,48 +320,72 @@ class MongoDBManager:
     
     async def obter_estatisticas_dashboard(self) -> Dict[str, Any]:
         """
-        Obtém estatísticas para o dashboard
+        Obtém estatísticas para o dashboard (em cache por TTL_ESTATISTICAS_DASHBOARD)
+        """
+        cache = self._cache_estatisticas
+        if cache and time.monotonic() - cache[0] < TTL_ESTATISTICAS_DASHBOARD:
+            return cache[1]
+        
+        async with self._lock_estatisticas:
+            # Outra chamada pode ter atualizado o cache enquanto aguardávamos
+            cache = self._cache_estatisticas
+            agora = time.monotonic()
+            if cache and agora - cache[0] < TTL_ESTATISTICAS_DASHBOARD:
+                return cache[1]
+            
+            estatisticas = await self._consultar_estatisticas_dashboard()
+            if estatisticas:
+                self._cache_estatisticas = (agora, estatisticas)
+            return estatisticas
+    
+    async def _consultar_estatisticas_dashboard(self) -> Dict[str, Any]:
+        """
+        Consulta as estatísticas do dashboard no MongoDB
         """
         if not self.conectado:
             await self.conectar()
         
         try:
-            # Total de execuções
-            total_execucoes = await self.database.execucoes_rpa.count_documents({})
-            
-            # Execuções hoje
-            hoje = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
-            execucoes_hoje = await self.database.execucoes_rpa.count_documents({
-                "timestamp_inicio": {"$gte": hoje}
-            })
+            agora = datetime.now()
+            hoje = agora.replace(hour=0, minute=0, second=0, microsecond=0)
+            data_limite = agora - timedelta(days=30)
             
             # Taxa de sucesso últimos 30 dias
-            data_limite = datetime.now() - timedelta(days=30)
-            cursor_recentes = self.database.execucoes_rpa.find({
-                "timestamp_inicio": {"$gte": data_limite}
-            })
-            
-            total_recentes = 0
-            sucessos_recentes = 0
+            pipeline = [
+                {"$match": {"timestamp_inicio": {"$gte": data_limite}}},
+                {"$group": {
+                    "_id": None,
+                    "total": {"$sum": 1},
+                    "sucessos": {"$sum": {"$cond": ["$sucesso", 1, 0]}}
+                }}
+            ]
+            
+            # Consultas independentes executadas em paralelo no pool
+            total_execucoes, execucoes_hoje, agregado, contratos_processados = await asyncio.gather(
+                # Total de execuções (contagem pelos metadados da collection, O(1))
+                self.database.execucoes_rpa.estimated_document_count(),
+                # Execuções hoje
+                self.database.execucoes_rpa.count_documents({
+                    "timestamp_inicio": {"$gte": hoje}
+                }),
+                self.database.execucoes_rpa.aggregate(pipeline).to_list(length=1),
+                # Contratos processados últimos 30 dias
+                self.database.contratos_processados.count_documents({
+                    "data_processamento": {"$gte": data_limite}
+                })
+            )
             
-            async for doc in cursor_recentes:
-                total_recentes += 1
-                if doc.get("sucesso"):
-                    sucessos_recentes += 1
+            total_recentes = agregado[0]["total"] if agregado else 0
+            sucessos_recentes = agregado[0]["sucessos"] if agregado else 0
             
             taxa_sucesso = (sucessos_recentes / total_recentes * 100) if total_recentes > 0 else 0
             
-            # Contratos processados últimos 30 dias
-            contratos_processados = await self.database.contratos_processados.count_documents({
-                "data_processamento": {"$gte": data_limite}
-            })
-            
             return {
                 "total_execucoes": total_execucoes,
                 "execucoes_hoje": execucoes_hoje,
                 "taxa_sucesso": round(taxa_sucesso, 1),
                 "contratos_processados_mes": contratos_processados,
-                "ultima_atualizacao": datetime.now().isoformat()
+                "ultima_atualizacao": agora.isoformat()
             }
             
         except Exception as e:
@@ -306,13 +397,72 @@ class MongoDBManager:
         Desconecta do MongoDB
         """
         if self.client:
+            # Grava execuções ainda no buffer antes de fechar o pool
+            await buffer_auditoria.descarregar()
             self.client.close()
+            self.client = None
             self.conectado = False
             logger.info("🔌 Desconectado do MongoDB")
 
+class BufferAuditoria:
+    """
+    Buffer assíncrono para documentos de auditoria das execuções
+
+    Os documentos são acumulados em memória e gravados em lote com
+    insert_many(ordered=False) na collection de auditoria (w=0) a cada
+    `intervalo` segundos ou quando o lote enche, tirando a escrita no
+    MongoDB do caminho crítico dos RPAs.
+    """
+    
+    def __init__(self, manager: MongoDBManager, tamanho_lote: int = 100, intervalo: float = 1.0):
+        self.manager = manager
+        self.tamanho_lote = tamanho_lote
+        self.intervalo = intervalo
+        self._pendentes: deque = deque(maxlen=LIMITE_AUDITORIAS_PENDENTES)
+        self._tarefa: Optional[asyncio.Task] = None
+    
+    def adicionar(self, documento: Dict[str, Any]):
+        """
+        Enfileira documento para gravação em background (não bloqueia)
+        """
+        self._pendentes.append(documento)
+        
+        if self._tarefa is None or self._tarefa.done():
+            atraso = 0 if len(self._pendentes) >= self.tamanho_lote else self.intervalo
+            self._tarefa = asyncio.get_running_loop().create_task(self._descarregar_apos(atraso))
+    
+    async def _descarregar_apos(self, atraso: float):
+        await asyncio.sleep(atraso)
+        await self.descarregar()
+    
+    async def descarregar(self):
+        """
+        Grava todos os documentos pendentes em lotes (usar também no shutdown)
+        """
+        while self._pendentes:
+            quantidade = min(self.tamanho_lote, len(self._pendentes))
+            lote = [self._pendentes.popleft() for _ in range(quantidade)]
+            
+            try:
+                # conectar() retorna na hora se já conectado ou em backoff
+                if not await self.manager.conectar():
+                    # Lote volta para o início da fila; gravado no próximo descarregamento
+                    self._pendentes.extendleft(reversed(lote))
+                    logger.warning(f"⚠️ MongoDB indisponível: {len(self._pendentes)} auditorias pendentes")
+                    return
+                
+                await self.manager.collection_auditoria.insert_many(lote, ordered=False)
+                logger.info(f"💾 {quantidade} execuções salvas no MongoDB para auditoria")
+                
+            except Exception as e:
+                logger.error(f"⚠️ Erro ao salvar lote de auditoria: {str(e)}")
+
 # Instância global do MongoDB Manager
 mongodb_manager = MongoDBManager()
 
+# Buffer global de auditoria das execuções
+buffer_auditoria = BufferAuditoria(mongodb_manager)
+
 # Funções auxiliares para facilitar uso
 async def salvar_execucao(nome_rpa: str, parametros: Dict[str, Any], resultado: Dict[str, Any]) -> str:
     """Função auxiliar para salvar execução"""
@@ -6,27 +6,81 @@ Desenvolvido em Português Brasileiro
 """
 
 import os
-import json
+import copy
 import base64
-from datetime import datetime
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
-from typing import Dict, List, Any, Optional
+import atexit
+import functools
+import random
+import time
+from html import escape
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime, timezone
+from itertools import islice
+from email.header import Header
+from typing import Dict, List, Any, Optional, Tuple
 from enum import Enum
+from string import Template
 import logging
 
-# Configurar logging
-logging.basicConfig(level=logging.INFO)
+from core.configuracoes_notificacoes import (
+    ARQUIVO_CONFIGURACOES,
+    gravar_configuracoes_arquivo,
+    ler_configuracoes_arquivo,
+    serializar_configuracoes,
+)
+
 logger = logging.getLogger(__name__)
 
 try:
     from google.oauth2.service_account import Credentials
+    from google.auth.transport.requests import Request as RequisicaoGoogle
     from googleapiclient.discovery import build
+    from googleapiclient.errors import HttpError
+    from google_auth_httplib2 import AuthorizedHttp
+    import httplib2
     GOOGLE_DISPONIVEL = True
 except ImportError:
     GOOGLE_DISPONIVEL = False
     logger.warning("Bibliotecas do Google não disponíveis. Instale: pip install google-api-python-client google-auth")
 
+# Máximo de requisições por BatchHttpRequest aceito pela Gmail API
+LIMITE_LOTE_GMAIL = 100
+
+# Retentativas com backoff exponencial (e jitter) em erros transitórios da Gmail API
+STATUS_RETENTAVEIS = frozenset({429, 500, 502, 503, 504})
+MAX_TENTATIVAS_ENVIO = 5
+ESPERA_RETENTATIVA_INICIAL = 1.0
+ESPERA_RETENTATIVA_MAXIMA = 30.0
+
+# Renovação antecipada do token OAuth (o token da conta de serviço vale ~60 min)
+INTERVALO_RENOVACAO_TOKEN = 55 * 60
+ANTECEDENCIA_RENOVACAO_TOKEN = 5 * 60
+ESPERA_RENOVACAO_FALHA = 60
+
+# Envios em background: o RPA não espera o round-trip da Gmail API
+_POOL_ENVIOS = ThreadPoolExecutor(max_workers=4, thread_name_prefix='notif')
+atexit.register(_POOL_ENVIOS.shutdown, wait=True)
+
+# Janela (s) em que notificações repetidas do mesmo RPA viram um único resumo
+JANELA_AGRUPAMENTO_SEGUNDOS = 60.0
+
+# Chaves de resultado que são contadores: somadas no resumo de execuções agrupadas
+# (as demais, como taxas e índices, são listadas por execução)
+CHAVES_CONTADORES = frozenset({
+    'contratos_identificados',
+    'contratos_processados',
+    'planilhas_analisadas',
+    'quantidade_contratos'
+})
+
+# Timeout (s) das conexões HTTP com a Gmail API
+TIMEOUT_HTTP_GMAIL = 30
+
+# Uma conexão HTTP autorizada por thread (httplib2.Http não é thread-safe);
+# reaproveitada entre envios para não refazer o handshake TLS a cada chamada
+_HTTP_POR_THREAD = threading.local()
+
 class TipoEvento(Enum):
     """Tipos de evento do sistema RPA"""
     SUCESSO = "sucesso"
@@ -35,129 +89,305 @@ class TipoEvento(Enum):
     CONCLUIDO = "concluido"
     ALERTA = "alerta"
 
+# Arquivo de credenciais da conta de serviço, resolvido uma única vez na importação
+_POSSIVEIS_ARQUIVOS_CREDENCIAIS = (
+    'credentials/google_service_account.json',
+    'deploy/credentials/google_service_account.json',
+    'gspread-459713-aab8a657f9b0.json'  # Arquivo existente do projeto
+)
+ARQUIVO_CREDENCIAIS: Optional[str] = next(
+    (arquivo for arquivo in _POSSIVEIS_ARQUIVOS_CREDENCIAIS if os.path.exists(arquivo)),
+    os.getenv('GOOGLE_APPLICATION_CREDENTIALS')
+)
+
+def _espera_retentativa(tentativa: int, retry_after: Optional[str] = None) -> float:
+    """
+    Segundos a aguardar antes da próxima tentativa: o Retry-After do servidor,
+    se houver, ou backoff exponencial com jitter (limitado a ESPERA_RETENTATIVA_MAXIMA)
+    """
+    if retry_after:
+        try:
+            return min(float(retry_after), ESPERA_RETENTATIVA_MAXIMA)
+        except ValueError:
+            pass
+    espera = min(ESPERA_RETENTATIVA_INICIAL * (2 ** tentativa), ESPERA_RETENTATIVA_MAXIMA)
+    return espera * random.uniform(0.8, 1.2)
+
+def _erro_retentavel(erro: Optional[Exception]) -> bool:
+    """Verifica se o erro da Gmail API é transitório (rate limit ou 5xx)"""
+    return isinstance(erro, HttpError) and erro.resp.status in STATUS_RETENTAVEIS
+
+@functools.lru_cache(maxsize=8)
+def _codificar_corpo(corpo_html: str) -> bytes:
+    """
+    Corpo HTML em base64, em linhas de 76 caracteres (RFC 2045); em cache porque
+    o mesmo HTML é enviado a todos os destinatários de uma notificação
+    """
+    return base64.encodebytes(corpo_html.encode('utf-8')).replace(b'\n', b'\r\n')
+
+def _agendar_renovacao_token(credentials, espera: Optional[float] = None):
+    """
+    Agenda a renovação do token em background antes de ele expirar, para que
+    nenhum envio pague a assinatura JWT + troca de token no caminho crítico
+    """
+    if espera is None:
+        espera = INTERVALO_RENOVACAO_TOKEN
+        if credentials.expiry is not None:
+            # expiry das credenciais do google-auth é UTC sem timezone
+            agora_utc = datetime.now(timezone.utc).replace(tzinfo=None)
+            restante = (credentials.expiry - agora_utc).total_seconds()
+            espera = max(restante - ANTECEDENCIA_RENOVACAO_TOKEN, ESPERA_RENOVACAO_FALHA)
+    
+    timer = threading.Timer(espera, _renovar_token, (credentials,))
+    timer.daemon = True
+    timer.start()
+
+def _renovar_token(credentials):
+    """Renova o token OAuth e reagenda a próxima renovação"""
+    try:
+        credentials.refresh(RequisicaoGoogle())
+        logger.debug("Token da Gmail API renovado")
+    except Exception as e:
+        logger.warning("Erro ao renovar token da Gmail API: %s", e)
+        _agendar_renovacao_token(credentials, ESPERA_RENOVACAO_FALHA)
+        return
+    _agendar_renovacao_token(credentials)
+
+@functools.lru_cache(maxsize=1)
+def _obter_credenciais_gmail(email_remetente: str):
+    """
+    Carrega as credenciais da conta de serviço, delegadas ao remetente, uma única
+    vez por processo
+    """
+    try:
+        if not GOOGLE_DISPONIVEL:
+            logger.warning("Google APIs não disponíveis")
+            return None
+        
+        if not ARQUIVO_CREDENCIAIS:
+            logger.warning("Arquivo de credenciais do Google não encontrado")
+            return None
+        
+        # Carregar credenciais
+        credentials = Credentials.from_service_account_file(
+            ARQUIVO_CREDENCIAIS,
+            scopes=['https://www.googleapis.com/auth/gmail.send']
+        )
+        
+        # Delegar credenciais para o email remetente (deve ser delegado na conta de serviço)
+        credentials = credentials.with_subject(email_remetente)
+        _agendar_renovacao_token(credentials)
+        return credentials
+        
+    except Exception as e:
+        logger.error("Erro ao carregar credenciais do Google: %s", e)
+        return None
+
+def _obter_http_gmail(credentials):
+    """Retorna a conexão HTTP autorizada (keep-alive) da thread atual"""
+    http = getattr(_HTTP_POR_THREAD, 'http', None)
+    if http is None or http.credentials is not credentials:
+        http = AuthorizedHttp(credentials, http=httplib2.Http(timeout=TIMEOUT_HTTP_GMAIL))
+        _HTTP_POR_THREAD.http = http
+    return http
+
+@functools.lru_cache(maxsize=1)
+def _obter_servico_gmail(email_remetente: str):
+    """
+    Cria o serviço Gmail uma única vez por processo (compartilhado por todos
+    os notificadores)
+    """
+    try:
+        credentials = _obter_credenciais_gmail(email_remetente)
+        if credentials is None:
+            return None
+        
+        # Criar serviço Gmail com o documento de discovery embutido (sem buscar na rede)
+        service = build('gmail', 'v1', http=_obter_http_gmail(credentials),
+                        cache_discovery=False, static_discovery=True)
+        
+        logger.info("Gmail API inicializada com sucesso para %s", email_remetente)
+        return service
+        
+    except Exception as e:
+        logger.error("Erro ao inicializar Gmail API: %s", e)
+        return None
+
 class NotificadorEmail:
     """Notificador simples usando Gmail API"""
     
+    __slots__ = ('email_remetente', 'credentials', 'service')
+    
     def __init__(self):
-        self.service = None
-        self.email_remetente = None
-        self._inicializar_gmail()
+        self.email_remetente = os.getenv('EMAIL_REMETENTE', 'sistema.rpa@empresa.com')
+        self.credentials = _obter_credenciais_gmail(self.email_remetente)
+        self.service = _obter_servico_gmail(self.email_remetente)
     
-    def _inicializar_gmail(self):
-        """Inicializa conexão com Gmail API"""
-        try:
-            if not GOOGLE_DISPONIVEL:
-                logger.warning("Google APIs não disponíveis")
-                return
-                
-            # Verificar se existe arquivo de credenciais
-            arquivo_credenciais = None
-            possiveis_arquivos = [
-                'credentials/google_service_account.json',
-                'deploy/credentials/google_service_account.json',
-                'gspread-459713-aab8a657f9b0.json'  # Arquivo existente do projeto
-            ]
-            
-            for arquivo in possiveis_arquivos:
-                if os.path.exists(arquivo):
-                    arquivo_credenciais = arquivo
-                    break
-            
-            if not arquivo_credenciais:
-                logger.warning("Arquivo de credenciais do Google não encontrado")
-                return
-            
-            # Carregar credenciais
-            credentials = Credentials.from_service_account_file(
-                arquivo_credenciais,
-                scopes=['https://www.googleapis.com/auth/gmail.send']
-            )
-            
-            # Configurar email do remetente (deve ser delegado na conta de serviço)
-            self.email_remetente = os.getenv('EMAIL_REMETENTE', 'sistema.rpa@empresa.com')
-            
-            # Delegar credenciais para o email remetente
-            delegated_credentials = credentials.with_subject(self.email_remetente)
-            
-            # Criar serviço Gmail
-            self.service = build('gmail', 'v1', credentials=delegated_credentials)
-            
-            logger.info(f"Gmail API inicializada com sucesso para {self.email_remetente}")
-            
-        except Exception as e:
-            logger.error(f"Erro ao inicializar Gmail API: {e}")
-            self.service = None
+    def _montar_mensagem(self, destinatario: str, assunto: str, corpo_html: str) -> str:
+        """
+        Monta a mensagem (RFC 5322, HTML em base64) e retorna o conteúdo raw
+        (base64 url-safe). A estrutura é fixa, então os bytes são montados
+        diretamente, sem passar pelo gerador do pacote email
+        """
+        # Assunto com acentos/emojis: encoded-word RFC 2047 (ASCII puro vai direto)
+        if assunto.isascii():
+            assunto_codificado = assunto
+        else:
+            assunto_codificado = Header(assunto, 'utf-8').encode(linesep='\r\n')
+        
+        cabecalhos = (
+            f"To: {destinatario}\r\n"
+            f"From: {self.email_remetente}\r\n"
+            f"Subject: {assunto_codificado}\r\n"
+            "MIME-Version: 1.0\r\n"
+            "Content-Type: text/html; charset=utf-8\r\n"
+            "Content-Transfer-Encoding: base64\r\n\r\n"
+        ).encode('ascii')
+        
+        return base64.urlsafe_b64encode(cabecalhos + _codificar_corpo(corpo_html)).decode('ascii')
     
     def enviar_email(self, destinatario: str, assunto: str, corpo_html: str) -> bool:
-        """Envia email usando Gmail API"""
+        """Envia email usando Gmail API (com retentativas em 429/5xx)"""
+        if not self.service:
+            logger.warning("Gmail API não inicializada")
+            return False
+        
         try:
-            if not self.service:
-                logger.warning("Gmail API não inicializada")
-                return False
-            
-            # Criar mensagem
-            message = MIMEMultipart('alternative')
-            message['to'] = destinatario
-            message['from'] = self.email_remetente
-            message['subject'] = assunto
-            
-            # Adicionar corpo HTML
-            html_part = MIMEText(corpo_html, 'html', 'utf-8')
-            message.attach(html_part)
-            
-            # Codificar mensagem
-            raw_message = base64.urlsafe_b64encode(message.as_bytes()).decode()
-            
-            # Enviar via Gmail API
-            self.service.users().messages().send(
-                userId='me',
-                body={'raw': raw_message}
-            ).execute()
-            
-            logger.info(f"Email enviado com sucesso para {destinatario}")
-            return True
-            
+            raw_message = self._montar_mensagem(destinatario, assunto, corpo_html)
+            http = _obter_http_gmail(self.credentials)
         except Exception as e:
-            logger.error(f"Erro ao enviar email para {destinatario}: {e}")
+            logger.error("Erro ao enviar email para %s: %s", destinatario, e)
             return False
-
-class GeradorTemplates:
-    """Gerador de templates HTML para notificações"""
+        
+        for tentativa in range(MAX_TENTATIVAS_ENVIO):
+            try:
+                # Enviar via Gmail API
+                self.service.users().messages().send(
+                    userId='me',
+                    body={'raw': raw_message}
+                ).execute(http=http)
+                
+                logger.info("Email enviado com sucesso para %s", destinatario)
+                return True
+                
+            except Exception as e:
+                if not _erro_retentavel(e) or tentativa == MAX_TENTATIVAS_ENVIO - 1:
+                    logger.error("Erro ao enviar email para %s: %s", destinatario, e)
+                    return False
+                espera = _espera_retentativa(tentativa, e.resp.get('retry-after'))
+                logger.warning("Gmail API retornou %s para %s; nova tentativa em %.1fs",
+                               e.resp.status, destinatario, espera)
+                time.sleep(espera)
+        
+        return False
     
-    @staticmethod
-    def gerar_template_base(titulo: str, conteudo: str, tipo_evento: TipoEvento) -> str:
-        """Gera template HTML base para notificações"""
+    def enviar_lote(self, mensagens: List[Tuple[str, str, str]]) -> Dict[str, bool]:
+        """
+        Envia várias mensagens (destinatario, assunto, corpo_html) agrupadas em
+        BatchHttpRequest: uma chamada HTTP a cada LIMITE_LOTE_GMAIL mensagens
         
-        # Cores por tipo de evento
-        cores = {
-            TipoEvento.SUCESSO: {"primaria": "#28a745", "secundaria": "#d4edda"},
-            TipoEvento.ERRO: {"primaria": "#dc3545", "secundaria": "#f8d7da"},
-            TipoEvento.ALERTA: {"primaria": "#ffc107", "secundaria": "#fff3cd"},
-            TipoEvento.INICIO: {"primaria": "#007bff", "secundaria": "#d1ecf1"},
-            TipoEvento.CONCLUIDO: {"primaria": "#17a2b8", "secundaria": "#d1ecf1"}
-        }
+        As mensagens com erro transitório (429/5xx) são reenviadas em um novo
+        lote após backoff, até MAX_TENTATIVAS_ENVIO tentativas.
         
-        cor_config = cores.get(tipo_evento, cores[TipoEvento.ALERTA])
+        Returns:
+            Sucesso do envio por destinatário
+        """
+        resultados = {destinatario: False for destinatario, _, _ in mensagens}
         
-        # Ícones por tipo
-        icones = {
-            TipoEvento.SUCESSO: "✅",
-            TipoEvento.ERRO: "❌",
-            TipoEvento.ALERTA: "⚠️",
-            TipoEvento.INICIO: "🚀",
-            TipoEvento.CONCLUIDO: "🎉"
-        }
+        if not self.service:
+            logger.warning("Gmail API não inicializada")
+            return resultados
         
-        icone = icones.get(tipo_evento, "📋")
-        timestamp = datetime.now().strftime('%d/%m/%Y às %H:%M:%S')
+        ultima_tentativa = False
+        retentar: List[int] = []
+        retry_after: List[str] = []
         
-        return f"""
+        def _callback(request_id: str, response: Any, exception: Optional[Exception]):
+            indice = int(request_id)
+            destinatario = mensagens[indice][0]
+            if exception is not None:
+                if _erro_retentavel(exception) and not ultima_tentativa:
+                    retentar.append(indice)
+                    if exception.resp.get('retry-after'):
+                        retry_after.append(exception.resp['retry-after'])
+                    return
+                logger.error("Erro ao enviar email para %s: %s", destinatario, exception)
+                return
+            resultados[destinatario] = True
+            logger.info("Email enviado com sucesso para %s", destinatario)
+        
+        http = _obter_http_gmail(self.credentials)
+        pendentes = list(range(len(mensagens)))
+        for tentativa in range(MAX_TENTATIVAS_ENVIO):
+            ultima_tentativa = tentativa == MAX_TENTATIVAS_ENVIO - 1
+            retentar.clear()
+            retry_after.clear()
+            
+            indices = iter(pendentes)
+            while True:
+                bloco = list(islice(indices, LIMITE_LOTE_GMAIL))
+                if not bloco:
+                    break
+                
+                try:
+                    batch = self.service.new_batch_http_request(callback=_callback)
+                    for indice in bloco:
+                        raw_message = self._montar_mensagem(*mensagens[indice])
+                        batch.add(
+                            self.service.users().messages().send(userId='me', body={'raw': raw_message}),
+                            request_id=str(indice)
+                        )
+                    batch.execute(http=http)
+                    
+                except Exception as e:
+                    if _erro_retentavel(e) and not ultima_tentativa:
+                        retentar.extend(bloco)
+                        continue
+                    logger.error("Erro ao enviar lote de %s emails: %s", len(bloco), e)
+            
+            if not retentar:
+                break
+            
+            espera = max((_espera_retentativa(tentativa, valor) for valor in retry_after),
+                         default=_espera_retentativa(tentativa))
+            logger.warning("%s emails com erro transitório; nova tentativa em %.1fs", len(retentar), espera)
+            time.sleep(espera)
+            pendentes = list(retentar)
+        
+        return resultados
+
+# Cores (primária, secundária) e ícones por tipo de evento
+_CORES = {
+    TipoEvento.SUCESSO: ("#28a745", "#d4edda"),
+    TipoEvento.ERRO: ("#dc3545", "#f8d7da"),
+    TipoEvento.ALERTA: ("#ffc107", "#fff3cd"),
+    TipoEvento.INICIO: ("#007bff", "#d1ecf1"),
+    TipoEvento.CONCLUIDO: ("#17a2b8", "#d1ecf1")
+}
+
+_ICONES = {
+    TipoEvento.SUCESSO: "✅",
+    TipoEvento.ERRO: "❌",
+    TipoEvento.ALERTA: "⚠️",
+    TipoEvento.INICIO: "🚀",
+    TipoEvento.CONCLUIDO: "🎉"
+}
+
+# Rótulo exibido de cada tipo de evento, calculado uma única vez
+_ROTULOS_EVENTO = {tipo: tipo.value.title() for tipo in TipoEvento}
+
+# Templates HTML compilados uma única vez na importação
+# Partes estáticas do template base (cabeçalho do documento e rodapé) ficam fora
+# do Template: substitute() só percorre o trecho com placeholders
+_HTML_INICIO = """
         <!DOCTYPE html>
         <html lang="pt-BR">
         <head>
             <meta charset="UTF-8">
             <meta name="viewport" content="width=device-width, initial-scale=1.0">
-            <title>{titulo}</title>
+            <title>"""
+
+_TEMPLATE_BASE = Template("""${titulo}</title>
         </head>
         <body style="margin: 0; padding: 0; font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif; background-color: #f5f5f5;">
             <table width="100%" cellpadding="0" cellspacing="0" style="background-color: #f5f5f5;">
@@ -167,9 +397,9 @@ class GeradorTemplates:
                             
                             <!-- Cabeçalho -->
                             <tr>
-                                <td style="background: linear-gradient(135deg, {cor_config['primaria']}, {cor_config['primaria']}dd); color: white; padding: 30px; text-align: center;">
-                                    <div style="font-size: 48px; margin-bottom: 10px;">{icone}</div>
-                                    <h1 style="margin: 0; font-size: 24px; font-weight: 600;">{titulo}</h1>
+                                <td style="background: linear-gradient(135deg, ${cor_primaria}, ${cor_primaria}dd); color: white; padding: 30px; text-align: center;">
+                                    <div style="font-size: 48px; margin-bottom: 10px;">${icone}</div>
+                                    <h1 style="margin: 0; font-size: 24px; font-weight: 600;">${titulo}</h1>
                                     <p style="margin: 8px 0 0 0; font-size: 14px; opacity: 0.9;">Sistema RPA de Reparcelamento</p>
                                 </td>
                             </tr>
@@ -178,7 +408,7 @@ class GeradorTemplates:
                             <tr>
                                 <td style="padding: 30px;">
                                     <div style="line-height: 1.6; color: #333; font-size: 16px;">
-                                        {conteudo}
+                                        ${conteudo}
                                     </div>
                                 </td>
                             </tr>
@@ -186,12 +416,12 @@ class GeradorTemplates:
                             <!-- Informações Técnicas -->
                             <tr>
                                 <td style="padding: 0 30px 30px 30px;">
-                                    <div style="background-color: {cor_config['secundaria']}; padding: 20px; border-radius: 8px; border-left: 4px solid {cor_config['primaria']};">
-                                        <h3 style="margin: 0 0 10px 0; color: {cor_config['primaria']}; font-size: 16px;">📊 Informações do Sistema</h3>
+                                    <div style="background-color: ${cor_secundaria}; padding: 20px; border-radius: 8px; border-left: 4px solid ${cor_primaria};">
+                                        <h3 style="margin: 0 0 10px 0; color: ${cor_primaria}; font-size: 16px;">📊 Informações do Sistema</h3>
                                         <table width="100%" style="font-size: 14px; color: #666;">
                                             <tr>
                                                 <td width="30%"><strong>Data/Hora:</strong></td>
-                                                <td>{timestamp}</td>
+                                                <td>${timestamp}</td>
                                             </tr>
                                             <tr>
                                                 <td><strong>Sistema:</strong></td>
@@ -199,7 +429,9 @@ class GeradorTemplates:
                                             </tr>
                                             <tr>
                                                 <td><strong>Tipo de Evento:</strong></td>
-                                                <td>{tipo_evento.value.title()}</td>
+                                                <td>${tipo_evento}</td>""")
+
+_HTML_FIM = """
                                             </tr>
                                         </table>
                                     </div>
@@ -223,11 +455,8 @@ class GeradorTemplates:
         </body>
         </html>
         """
-    
-    @staticmethod
-    def template_rpa_concluido(nome_rpa: str, tempo_execucao: str, resultados: Dict[str, Any]) -> str:
-        """Template para RPA concluído com sucesso"""
-        conteudo = f"""
+
+_TEMPLATE_RPA_CONCLUIDO = Template("""
         <h2 style="color: #28a745; margin-bottom: 20px;">🎉 Execução Concluída com Sucesso!</h2>
         
         <div style="background-color: #f8f9fa; padding: 20px; border-radius: 8px; margin: 20px 0;">
@@ -235,11 +464,11 @@ class GeradorTemplates:
             <table width="100%" style="margin: 15px 0;">
                 <tr style="border-bottom: 1px solid #dee2e6;">
                     <td style="padding: 10px 0; font-weight: bold; width: 30%;">RPA Executado:</td>
-                    <td style="padding: 10px 0;">{nome_rpa}</td>
+                    <td style="padding: 10px 0;">${nome_rpa}</td>
                 </tr>
                 <tr style="border-bottom: 1px solid #dee2e6;">
                     <td style="padding: 10px 0; font-weight: bold;">Tempo de Execução:</td>
-                    <td style="padding: 10px 0;">{tempo_execucao}</td>
+                    <td style="padding: 10px 0;">${tempo_execucao}</td>
                 </tr>
                 <tr style="border-bottom: 1px solid #dee2e6;">
                     <td style="padding: 10px 0; font-weight: bold;">Status:</td>
@@ -251,30 +480,16 @@ class GeradorTemplates:
         <div style="background-color: #e7f3ff; padding: 20px; border-radius: 8px; border-left: 4px solid #007bff;">
             <h4 style="margin-top: 0; color: #0056b3;">📊 Resultados Principais</h4>
             <ul style="margin: 10px 0; padding-left: 20px;">
-        """
-        
-        for chave, valor in resultados.items():
-            conteudo += f"<li><strong>{chave.replace('_', ' ').title()}:</strong> {valor}</li>"
-        
-        conteudo += """
+        ${itens}
             </ul>
         </div>
         
         <p style="margin-top: 25px; color: #6c757d; font-style: italic;">
             O sistema continuará monitorando as próximas execuções automaticamente.
         </p>
-        """
-        
-        return GeradorTemplates.gerar_template_base(
-            f"RPA {nome_rpa} - Execução Concluída",
-            conteudo,
-            TipoEvento.SUCESSO
-        )
-    
-    @staticmethod
-    def template_erro_rpa(nome_rpa: str, erro: str, detalhes: str) -> str:
-        """Template para erro no RPA"""
-        conteudo = f"""
+        """)
+
+_TEMPLATE_ERRO_RPA = Template("""
         <h2 style="color: #dc3545; margin-bottom: 20px;">⚠️ Erro Detectado no Sistema</h2>
         
         <div style="background-color: #f8d7da; padding: 20px; border-radius: 8px; border-left: 4px solid #dc3545; margin: 20px 0;">
@@ -282,18 +497,18 @@ class GeradorTemplates:
             <table width="100%" style="margin: 15px 0;">
                 <tr style="border-bottom: 1px solid #f5c6cb;">
                     <td style="padding: 10px 0; font-weight: bold; width: 30%;">RPA Afetado:</td>
-                    <td style="padding: 10px 0;">{nome_rpa}</td>
+                    <td style="padding: 10px 0;">${nome_rpa}</td>
                 </tr>
                 <tr style="border-bottom: 1px solid #f5c6cb;">
                     <td style="padding: 10px 0; font-weight: bold;">Tipo de Erro:</td>
-                    <td style="padding: 10px 0; color: #dc3545; font-weight: bold;">{erro}</td>
+                    <td style="padding: 10px 0; color: #dc3545; font-weight: bold;">${erro}</td>
                 </tr>
             </table>
         </div>
         
         <div style="background-color: #fff3cd; padding: 20px; border-radius: 8px; border-left: 4px solid #ffc107;">
             <h4 style="margin-top: 0; color: #856404;">📝 Detalhes Técnicos</h4>
-            <div style="background-color: #ffffff; padding: 15px; border-radius: 4px; font-family: monospace; font-size: 14px; color: #495057; white-space: pre-wrap;">{detalhes}</div>
+            <div style="background-color: #ffffff; padding: 15px; border-radius: 4px; font-family: monospace; font-size: 14px; color: #495057; white-space: pre-wrap;">${detalhes}</div>
         </div>
         
         <div style="background-color: #d1ecf1; padding: 20px; border-radius: 8px; margin-top: 20px;">
@@ -305,7 +520,64 @@ class GeradorTemplates:
                 <li>Executar teste para validar a correção</li>
             </ol>
         </div>
-        """
+        """)
+
+@functools.lru_cache(maxsize=128)
+def _formatar_chave(chave: str) -> str:
+    """Rótulo exibível de uma chave de resultado ('contratos_processados' -> 'Contratos Processados')"""
+    return escape(chave.replace('_', ' ').title())
+
+class GeradorTemplates:
+    """Gerador de templates HTML para notificações"""
+    
+    __slots__ = ()
+    
+    @staticmethod
+    def gerar_template_base(titulo: str, conteudo: str, tipo_evento: TipoEvento) -> str:
+        """Gera template HTML base para notificações"""
+        cor_primaria, cor_secundaria = _CORES.get(tipo_evento, _CORES[TipoEvento.ALERTA])
+        
+        meio = _TEMPLATE_BASE.substitute(
+            titulo=escape(titulo),
+            conteudo=conteudo,
+            cor_primaria=cor_primaria,
+            cor_secundaria=cor_secundaria,
+            icone=_ICONES.get(tipo_evento, "📋"),
+            timestamp=datetime.now().strftime('%d/%m/%Y às %H:%M:%S'),
+            tipo_evento=_ROTULOS_EVENTO[tipo_evento]
+        )
+        
+        return "".join((_HTML_INICIO, meio, _HTML_FIM))
+    
+    @staticmethod
+    def template_rpa_concluido(nome_rpa: str, tempo_execucao: str, resultados: Dict[str, Any]) -> str:
+        """Template para RPA concluído com sucesso"""
+        itens = "".join(
+            f"<li><strong>{_formatar_chave(chave)}:</strong> {escape(str(valor))}</li>"
+            for chave, valor in resultados.items()
+        )
+        
+        conteudo = _TEMPLATE_RPA_CONCLUIDO.substitute(
+            nome_rpa=escape(nome_rpa),
+            tempo_execucao=escape(str(tempo_execucao)),
+            itens=itens
+        )
+        
+        return GeradorTemplates.gerar_template_base(
+            f"RPA {nome_rpa} - Execução Concluída",
+            conteudo,
+            TipoEvento.SUCESSO
+        )
+    
+    @staticmethod
+    def template_erro_rpa(nome_rpa: str, erro: str, detalhes: str) -> str:
+        """Template para erro no RPA"""
+        # Mensagens de erro vêm de exceções/páginas externas: sempre escapar
+        conteudo = _TEMPLATE_ERRO_RPA.substitute(
+            nome_rpa=escape(nome_rpa),
+            erro=escape(str(erro)),
+            detalhes=escape(str(detalhes))
+        )
         
         return GeradorTemplates.gerar_template_base(
             f"ERRO - RPA {nome_rpa}",
@@ -313,12 +585,105 @@ class GeradorTemplates:
             TipoEvento.ERRO
         )
 
+def _registrar_falhas_envio(mensagens: List[Tuple[str, str, str]], futuro: Future):
+    """Registra no log falhas de um envio feito em background"""
+    assunto = mensagens[0][1]
+    try:
+        resultados = futuro.result()
+    except Exception as e:
+        logger.error("Erro no envio em background de '%s': %s", assunto, e)
+        return
+    
+    falhas = [destinatario for destinatario, _, _ in mensagens if not resultados.get(destinatario)]
+    if falhas:
+        logger.error("Falha ao enviar '%s' para: %s", assunto, ', '.join(falhas))
+
+def _resumir_execucoes(itens: List[Tuple[str, Dict[str, Any]]]) -> Dict[str, Any]:
+    """
+    Resultados do resumo de execuções agrupadas: soma apenas os CHAVES_CONTADORES
+    e mantém os demais campos de cada execução, na ordem em que chegaram
+    """
+    resumo: Dict[str, Any] = {'execucoes_agrupadas': len(itens)}
+    for _, resultados in itens:
+        for chave, valor in resultados.items():
+            if chave in CHAVES_CONTADORES and isinstance(valor, int) and not isinstance(valor, bool):
+                resumo[chave] = resumo.get(chave, 0) + valor
+    
+    for numero, (tempo_execucao, resultados) in enumerate(itens, start=1):
+        campos = "; ".join(
+            f"{chave.replace('_', ' ').title()}: {valor}"
+            for chave, valor in resultados.items()
+            if chave not in CHAVES_CONTADORES
+        )
+        resumo[f"execucao_{numero}"] = f"{tempo_execucao} - {campos}" if campos else tempo_execucao
+    return resumo
+
+class AgrupadorNotificacoes:
+    """
+    Agrupa (debounce) notificações repetidas da mesma chave em uma janela de tempo
+    
+    A primeira notificação de uma chave é enviada na hora e abre a janela; as que
+    chegarem durante a janela são acumuladas e enviadas em um único resumo quando
+    o timer expira.
+    """
+    
+    __slots__ = ('janela', 'ao_descarregar', '_pendentes', '_timers', '_lock')
+    
+    def __init__(self, janela: float, ao_descarregar):
+        self.janela = janela
+        self.ao_descarregar = ao_descarregar
+        self._pendentes: Dict[Any, List[Any]] = {}
+        self._timers: Dict[Any, threading.Timer] = {}
+        self._lock = threading.Lock()
+    
+    def adicionar(self, chave: Any, item: Any) -> bool:
+        """
+        Registra um item; retorna True se ele deve ser enviado imediatamente
+        (janela aberta agora) ou False se foi acumulado para o resumo
+        """
+        with self._lock:
+            if chave in self._timers:
+                self._pendentes.setdefault(chave, []).append(item)
+                return False
+            
+            timer = threading.Timer(self.janela, self._descarregar, (chave,))
+            timer.daemon = True
+            self._timers[chave] = timer
+            timer.start()
+            return True
+    
+    def _descarregar(self, chave: Any):
+        """Fecha a janela da chave e envia o resumo do que foi acumulado"""
+        with self._lock:
+            self._timers.pop(chave, None)
+            itens = self._pendentes.pop(chave, None)
+        
+        if itens:
+            try:
+                self.ao_descarregar(chave, itens)
+            except Exception as e:
+                logger.error("Erro ao enviar resumo de notificações agrupadas: %s", e)
+    
+    def descarregar_tudo(self):
+        """Cancela os timers e envia imediatamente todos os resumos pendentes"""
+        with self._lock:
+            chaves = list(self._timers)
+            for timer in self._timers.values():
+                timer.cancel()
+        
+        for chave in chaves:
+            self._descarregar(chave)
+
 class SistemaNotificacoes:
     """Sistema principal de notificações"""
     
+    __slots__ = ('notificador', 'configuracoes', 'agrupador')
+    
     def __init__(self):
         self.notificador = NotificadorEmail()
         self.configuracoes = self._carregar_configuracoes()
+        self.agrupador = AgrupadorNotificacoes(JANELA_AGRUPAMENTO_SEGUNDOS, self._enviar_resumo_rpa)
+        atexit.register(self.agrupador.descarregar_tudo)
     
     def _carregar_configuracoes(self) -> Dict[str, Any]:
         """Carrega configurações de notificação"""
@@ -337,35 +702,55 @@ class SistemaNotificacoes:
         }
         
         try:
-            if os.path.exists('config/notificacoes.json'):
-                with open('config/notificacoes.json', 'r', encoding='utf-8') as f:
-                    config_arquivo = json.load(f)
-                    config_padrao.update(config_arquivo)
+            info = os.stat(ARQUIVO_CONFIGURACOES)
+        except OSError:
+            return config_padrao
+        
+        try:
+            # Cópia profunda: a instância pode alterar listas/dicts sem afetar o cache
+            config_arquivo = ler_configuracoes_arquivo(ARQUIVO_CONFIGURACOES, info.st_mtime_ns, info.st_size)
+            config_padrao.update(copy.deepcopy(config_arquivo))
         except Exception as e:
-            logger.warning(f"Erro ao carregar configurações: {e}")
+            logger.warning("Erro ao carregar configurações: %s", e)
         
         return config_padrao
     
     def salvar_configuracoes(self):
         """Salva configurações"""
         try:
-            os.makedirs('config', exist_ok=True)
-            with open('config/notificacoes.json', 'w', encoding='utf-8') as f:
-                json.dump(self.configuracoes, f, indent=2, ensure_ascii=False)
+            gravar_configuracoes_arquivo(ARQUIVO_CONFIGURACOES, serializar_configuracoes(self.configuracoes))
         except Exception as e:
-            logger.error(f"Erro ao salvar configurações: {e}")
+            logger.error("Erro ao salvar configurações: %s", e)
+    
+    def _evento_habilitado(self, evento: str) -> bool:
+        """Verifica se as notificações estão ligadas e o evento habilitado (antes de renderizar)"""
+        configuracoes = self.configuracoes
+        return configuracoes.get('habilitado', True) and configuracoes.get('eventos', {}).get(evento, True)
     
     def notificar_rpa_concluido(self, nome_rpa: str, tempo_execucao: str, resultados: Dict[str, Any]) -> bool:
         """Notifica conclusão bem-sucedida de RPA"""
-        if not self.configuracoes.get('eventos', {}).get('rpa_concluido', True):
+        if not self._evento_habilitado('rpa_concluido'):
+            return True
+        
+        # Rajadas do mesmo RPA viram um resumo ao fim da janela de agrupamento
+        if not self.agrupador.adicionar(('rpa_concluido', nome_rpa), (tempo_execucao, resultados)):
             return True
             
         html = GeradorTemplates.template_rpa_concluido(nome_rpa, tempo_execucao, resultados)
         return self._enviar_para_todos(f"✅ RPA {nome_rpa} - Execução Concluída", html)
     
+    def _enviar_resumo_rpa(self, chave: Tuple[str, str], itens: List[Tuple[str, Dict[str, Any]]]) -> bool:
+        """Envia um único email com os resultados acumulados de um RPA"""
+        nome_rpa = chave[1]
+        tempo_execucao = itens[-1][0]
+        resultados = _resumir_execucoes(itens)
+        
+        html = GeradorTemplates.template_rpa_concluido(nome_rpa, tempo_execucao, resultados)
+        return self._enviar_para_todos(f"✅ RPA {nome_rpa} - {len(itens)} Execuções Concluídas", html)
+    
     def notificar_erro_rpa(self, nome_rpa: str, erro: str, detalhes: str) -> bool:
         """Notifica erro no RPA"""
-        if not self.configuracoes.get('eventos', {}).get('rpa_erro', True):
+        if not self._evento_habilitado('rpa_erro'):
             return True
             
         html = GeradorTemplates.template_erro_rpa(nome_rpa, erro, detalhes)
@@ -373,7 +758,7 @@ class SistemaNotificacoes:
     
     def notificar_workflow_concluido(self, rpas_executados: List[str], contratos_processados: int, tempo_total: str) -> bool:
         """Notifica conclusão de workflow completo"""
-        if not self.configuracoes.get('eventos', {}).get('workflow_concluido', True):
+        if not self._evento_habilitado('workflow_concluido'):
             return True
             
         conteudo = f"""
@@ -384,7 +769,7 @@ class SistemaNotificacoes:
             <table width="100%" style="margin: 15px 0;">
                 <tr style="border-bottom: 1px solid #b8daff;">
                     <td style="padding: 10px 0; font-weight: bold; width: 30%;">RPAs Executados:</td>
-                    <td style="padding: 10px 0;">{', '.join(rpas_executados)}</td>
+                    <td style="padding: 10px 0;">{escape(', '.join(rpas_executados))}</td>
                 </tr>
                 <tr style="border-bottom: 1px solid #b8daff;">
                     <td style="padding: 10px 0; font-weight: bold;">Contratos Processados:</td>
@@ -406,8 +791,13 @@ class SistemaNotificacoes:
         
         return self._enviar_para_todos("🔄 Workflow de Reparcelamento Concluído", html)
     
-    def _enviar_para_todos(self, assunto: str, html: str) -> bool:
-        """Envia notificação para todos os destinatários configurados"""
+    def _enviar_para_todos(self, assunto: str, html: str, aguardar: bool = False) -> bool:
+        """
+        Envia notificação para todos os destinatários configurados
+        
+        Por padrão o envio é agendado em background e retorna True de imediato
+        (falhas vão para o log); com aguardar=True retorna o resultado real.
+        """
         if not self.configuracoes.get('habilitado', True):
             return True
             
@@ -416,12 +806,15 @@ class SistemaNotificacoes:
             logger.warning("Nenhum destinatário configurado")
             return False
         
-        sucesso_geral = True
-        for destinatario in destinatarios:
-            sucesso = self.notificador.enviar_email(destinatario, assunto, html)
-            sucesso_geral = sucesso_geral and sucesso
+        # Todos os envios em uma única requisição batch da Gmail API
+        mensagens = [(destinatario, assunto, html) for destinatario in destinatarios]
+        futuro = _POOL_ENVIOS.submit(self.notificador.enviar_lote, mensagens)
+        
+        if aguardar:
+            return all(futuro.result().values())
         
-        return sucesso_geral
+        futuro.add_done_callback(functools.partial(_registrar_falhas_envio, mensagens))
+        return True
     
     def testar_configuracao(self) -> bool:
         """Testa configuração de notificações"""
@@ -439,7 +832,7 @@ class SistemaNotificacoes:
             TipoEvento.INICIO
         )
         
-        return self._enviar_para_todos("🧪 Teste - Sistema de Notificações", html)
+        return self._enviar_para_todos("🧪 Teste - Sistema de Notificações", html, aguardar=True)
 
 # Instância global
 notificacoes = SistemaNotificacoes()
@@ -0,0 +1,51 @@
+"""
+Registros de Execução
+Estrutura fixa (dataclass com slots) dos registros de execução dos RPAs,
+compartilhada pelo histórico JSON e pela persistência MongoDB
+
+Desenvolvido em Português Brasileiro
+"""
+
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, Any
+
+
+@dataclass(slots=True, frozen=True)
+class ExecucaoRPA:
+    """
+    Registro de uma execução de RPA
+
+    Montado uma única vez e compartilhado entre o MongoDB e o histórico JSON;
+    `parametros` e `resultado` são referenciados (não copiados) nas duas saídas.
+    """
+    # timestamp primeiro: cada linha JSONL começa por {"timestamp":"AAAA-MM-DD...,
+    # permitindo filtrar por data comparando só o prefixo dos bytes da linha
+    timestamp: datetime
+    nome_rpa: str
+    parametros: Dict[str, Any]
+    resultado: Dict[str, Any]
+
+    def para_dict(self) -> Dict[str, Any]:
+        """Registro no formato do histórico JSON"""
+        return {
+            "timestamp": self.timestamp.isoformat(),
+            "nome_rpa": self.nome_rpa,
+            "parametros": self.parametros,
+            "resultado": self.resultado
+        }
+
+    def para_documento(self) -> Dict[str, Any]:
+        """Documento no formato da collection execucoes_rpa"""
+        resultado = self.resultado
+        return {
+            "nome_rpa": self.nome_rpa,
+            "timestamp_inicio": self.timestamp,
+            "timestamp_fim": self.timestamp,
+            "parametros_entrada": self.parametros,
+            "resultado": resultado,
+            "sucesso": resultado.get("sucesso", False),
+            "tempo_execucao_segundos": resultado.get("tempo_execucao", 0),
+            "mensagem": resultado.get("mensagem", ""),
+            "erro": resultado.get("erro", None)
+        }
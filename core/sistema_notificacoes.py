@@ -6,20 +6,68 @@ Desenvolvido em Português Brasileiro
 """
 
 import os
+import re
 import json
+import asyncio
+import atexit
+import copy
+import functools
+import hashlib
 import smtplib
+import threading
 import requests
+from requests.adapters import HTTPAdapter
+from collections import ChainMap
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from datetime import datetime
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
-from typing import Dict, List, Any, Optional
+from string import Template
+from email import policy
+from email.message import EmailMessage
+from typing import Dict, List, Any, Optional, Tuple
 from enum import Enum
 import logging
 
+from core.configuracoes_notificacoes import (
+    ARQUIVO_CONFIGURACOES,
+    gravar_configuracoes_arquivo,
+    ler_configuracoes_arquivo,
+    serializar_configuracoes,
+)
+
 # Configurar logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Tentar importar aiohttp (webhooks em paralelo)
+try:
+    import aiohttp
+    AIOHTTP_DISPONIVEL = True
+except ImportError:
+    AIOHTTP_DISPONIVEL = False
+
+# Tentar importar Twilio (SMS)
+try:
+    from twilio.rest import Client as ClienteTwilio
+    TWILIO_DISPONIVEL = True
+except ImportError:
+    TWILIO_DISPONIVEL = False
+
+# Timeout (s) de cada chamada de webhook
+TIMEOUT_WEBHOOK = 30
+
+# Canais (email, SMS, webhook) de um evento são enviados em paralelo
+_POOL_CANAIS = ThreadPoolExecutor(max_workers=3, thread_name_prefix='canal')
+atexit.register(_POOL_CANAIS.shutdown, wait=True)
+
+# Bytes da resposta de um webhook com falha incluídos no log
+LIMITE_CORPO_ERRO_WEBHOOK = 1024
+
+# Limites do pool de conexões dos webhooks (total, por host e hosts distintos em cache)
+MAX_CONEXOES_WEBHOOK = 32
+MAX_CONEXOES_POR_HOST_WEBHOOK = 16
+MAX_HOSTS_WEBHOOK = 8
+
 class TipoNotificacao(Enum):
     """Tipos de notificação disponíveis"""
     EMAIL = "email"
@@ -50,6 +98,147 @@ class EventoRPA(Enum):
     SISTEMA_SAUDE = "sistema_saude"
     ERRO_CRITICO = "erro_critico"
 
+@dataclass(slots=True, frozen=True)
+class _ConfigEvento:
+    """Configuração já resolvida de um evento (canais e prioridade)"""
+    canais: Tuple[str, ...]
+    prioridade: str
+
+_CONFIG_EVENTO_PADRAO = _ConfigEvento(canais=(), prioridade=PrioridadeNotificacao.MEDIA.value)
+
+# Formatos (assunto, corpo, sms) por evento, montados uma única vez na importação
+_TEMPLATES_EVENTO = {
+    EventoRPA.RPA_INICIADO: (
+        '🚀 RPA Iniciado - {nome_rpa}',
+        'RPA "{nome_rpa}" foi iniciado às {timestamp}.',
+        'RPA {nome_rpa} iniciado às {timestamp}'
+    ),
+    EventoRPA.RPA_CONCLUIDO: (
+        '✅ RPA Concluído com Sucesso - {nome_rpa}',
+        'RPA "{nome_rpa}" concluído com sucesso.\nTempo de execução: {tempo_execucao}\nResultados: {resumo_resultados}',
+        '✅ RPA {nome_rpa} concluído com sucesso em {tempo_execucao}'
+    ),
+    EventoRPA.RPA_ERRO: (
+        '❌ ERRO no RPA - {nome_rpa}',
+        'ERRO detectado no RPA "{nome_rpa}".\nErro: {erro}\nDetalhes: {detalhes}\nAção necessária: Verificar logs e corrigir problema.',
+        '❌ ERRO no RPA {nome_rpa}: {erro:.100}'
+    ),
+    EventoRPA.WORKFLOW_CONCLUIDO: (
+        '🔄 Workflow Completo - Sistema RPA',
+        'Workflow de reparcelamento concluído.\nRPAs executados: {rpas_executados}\nContratos processados: {contratos_processados}\nTempo total: {tempo_total}',
+        '🔄 Workflow concluído: {contratos_processados} contratos processados'
+    ),
+    EventoRPA.INDICES_ATUALIZADOS: (
+        '📊 Índices Econômicos Atualizados',
+        'Índices econômicos atualizados com sucesso.\nIPCA: {ipca}\nIGPM: {igpm}\nData de referência: {data_referencia}',
+        '📊 Índices atualizados: IPCA {ipca} IGPM {igpm}'
+    ),
+    EventoRPA.CONTRATOS_IDENTIFICADOS: (
+        '📋 Contratos para Reparcelamento Identificados',
+        'Foram identificados {quantidade_contratos} contratos para reparcelamento.\nCritérios: {criterios}\nPróxima ação: Processamento automático via RPAs 3 e 4.',
+        '📋 {quantidade_contratos} contratos identificados para reparcelamento'
+    )
+}
+
+# Valores padrão dos campos ausentes em dados, por parte da mensagem
+_PADROES_ASSUNTO = {'nome_rpa': 'Sistema'}
+_PADROES_CORPO = {
+    'nome_rpa': '',
+    'tempo_execucao': 'N/A',
+    'resumo_resultados': 'N/A',
+    'erro': 'Não especificado',
+    'detalhes': 'N/A',
+    'rpas_executados': 'N/A',
+    'contratos_processados': 0,
+    'tempo_total': 'N/A',
+    'ipca': 'N/A',
+    'igpm': 'N/A',
+    'data_referencia': 'N/A',
+    'quantidade_contratos': 0,
+    'criterios': 'N/A'
+}
+_PADROES_CORPO_EVENTO = {EventoRPA.RPA_INICIADO: {'nome_rpa': 'Desconhecido'}}
+_PADROES_SMS = {
+    'nome_rpa': '',
+    'tempo_execucao': '',
+    'erro': '',
+    'contratos_processados': 0,
+    'ipca': '',
+    'igpm': '',
+    'quantidade_contratos': 0
+}
+
+# Dict vazio compartilhado (nunca modificar)
+_VAZIO: Dict[str, Any] = {}
+
+_PRIORIDADES_DESTACADAS = frozenset({PrioridadeNotificacao.ALTA.value, PrioridadeNotificacao.CRITICA.value})
+
+# Cor do cabeçalho do email por evento
+_CORES_EVENTO = {
+    EventoRPA.RPA_CONCLUIDO: "#28a745",
+    EventoRPA.WORKFLOW_CONCLUIDO: "#28a745",
+    EventoRPA.RPA_ERRO: "#dc3545",
+    EventoRPA.ERRO_CRITICO: "#dc3545",
+    EventoRPA.RPA_INICIADO: "#007bff",
+    EventoRPA.INDICES_ATUALIZADOS: "#17a2b8",
+    EventoRPA.CONTRATOS_IDENTIFICADOS: "#ffc107"
+}
+
+def _compactar_html(html: str) -> str:
+    """
+    Remove a indentação das linhas do template (sem efeito na renderização:
+    HTML e white-space: pre-line colapsam espaços), reduzindo os bytes por email
+    """
+    return re.sub(r"\n[ ]+", "\n", html).strip()
+
+# Template do email compilado uma única vez, dividido no ponto do horário: as duas
+# partes são cacheadas e o horário atual é inserido entre elas a cada envio
+_TEMPLATE_EMAIL_ANTES_HORARIO = Template(_compactar_html("""
+        <!DOCTYPE html>
+        <html>
+        <head>
+            <meta charset="UTF-8">
+            <title>${assunto}</title>
+        </head>
+        <body style="font-family: Arial, sans-serif; margin: 0; padding: 20px; background-color: #f8f9fa;">
+            <div style="max-width: 600px; margin: 0 auto; background-color: white; border-radius: 8px; box-shadow: 0 2px 4px rgba(0,0,0,0.1);">
+                <div style="background-color: ${cor}; color: white; padding: 20px; border-radius: 8px 8px 0 0;">
+                    <h1 style="margin: 0; font-size: 24px;">${assunto}</h1>
+                </div>
+                <div style="padding: 20px;">
+                    <div style="white-space: pre-line; line-height: 1.6; color: #333;">
+                        ${corpo}
+                    </div>
+                    <div style="margin-top: 20px; padding: 15px; background-color: #f8f9fa; border-radius: 4px; border-left: 4px solid ${cor};">
+                        <strong>Detalhes Técnicos:</strong><br>
+                        <small style="color: #666;">
+                            Sistema: RPA de Reparcelamento v2.0<br>
+                            Timestamp: """) + " ")
+_TEMPLATE_EMAIL_DEPOIS_HORARIO = Template(_compactar_html("""<br>
+                            Evento: ${evento}
+                        </small>
+                    </div>
+                </div>
+                <div style="padding: 20px; background-color: #f8f9fa; border-radius: 0 0 8px 8px; text-align: center; color: #666; font-size: 12px;">
+                    Esta é uma notificação automática do Sistema RPA de Reparcelamento.<br>
+                    Não responda a este email.
+                </div>
+            </div>
+        </body>
+        </html>
+        """))
+
+@functools.lru_cache(maxsize=512)
+def _renderizar_email_html(evento: EventoRPA, assunto: str, corpo: str) -> Tuple[str, str]:
+    """Partes do HTML do email (antes e depois do horário) por (evento, assunto, corpo)"""
+    valores = {
+        'cor': _CORES_EVENTO.get(evento, "#6c757d"),
+        'assunto': assunto,
+        'corpo': corpo,
+        'evento': evento.value
+    }
+    return _TEMPLATE_EMAIL_ANTES_HORARIO.substitute(valores), _TEMPLATE_EMAIL_DEPOIS_HORARIO.substitute(valores)
+
 class NotificadorEmail:
     """Gerenciador de notificações por email"""
     
@@ -59,28 +248,25 @@ class NotificadorEmail:
         self.email_usuario = os.getenv('EMAIL_USUARIO')
         self.email_senha = os.getenv('EMAIL_SENHA')
         self.email_remetente = os.getenv('EMAIL_REMETENTE', self.email_usuario)
+    
+    def _montar_mensagem(self, destinatario: str, assunto: str, corpo: str, html: bool) -> EmailMessage:
+        """Monta a mensagem de parte única com a política SMTP (CRLF, dobra de cabeçalhos moderna)"""
+        msg = EmailMessage(policy=policy.SMTP)
+        msg['From'] = self.email_remetente
+        msg['To'] = destinatario
+        msg['Subject'] = assunto
+        msg.set_content(corpo, subtype='html' if html else 'plain', charset='utf-8')
+        return msg
         
     def enviar_email(self, destinatario: str, assunto: str, corpo: str, html: bool = False) -> bool:
-        """Envia email para destinatário específico"""
+        """Envia email para destinatário específico (reaproveita a conexão da sessão ativa)"""
         try:
             if not all([self.email_usuario, self.email_senha]):
                 logger.warning("Credenciais de email não configuradas")
                 return False
-                
-            msg = MIMEMultipart('alternative')
-            msg['From'] = self.email_remetente
-            msg['To'] = destinatario
-            msg['Subject'] = assunto
-            
-            if html:
-                msg.attach(MIMEText(corpo, 'html', 'utf-8'))
-            else:
-                msg.attach(MIMEText(corpo, 'plain', 'utf-8'))
             
-            with smtplib.SMTP(self.smtp_server, self.smtp_port) as servidor:
-                servidor.starttls()
-                servidor.login(self.email_usuario, self.email_senha)
-                servidor.send_message(msg)
+            msg = self._montar_mensagem(destinatario, assunto, corpo, html)
+            self._enviar_mensagem(msg)
                 
             logger.info(f"Email enviado com sucesso para {destinatario}")
             return True
@@ -88,6 +274,46 @@ class NotificadorEmail:
         except Exception as e:
             logger.error(f"Erro ao enviar email: {e}")
             return False
+    
+    def enviar_email_multiplos(self, destinatarios: List[str], assunto: str, corpo: str, html: bool = False) -> bool:
+        """
+        Envia o mesmo email a vários destinatários em uma única transação SMTP
+        (um MAIL FROM, vários RCPT TO e um só DATA): To com o primeiro, Bcc com os demais
+        """
+        if not destinatarios:
+            return True
+        
+        try:
+            if not all([self.email_usuario, self.email_senha]):
+                logger.warning("Credenciais de email não configuradas")
+                return False
+            
+            msg = self._montar_mensagem(destinatarios[0], assunto, corpo, html)
+            if len(destinatarios) > 1:
+                # send_message inclui o Bcc nos destinatários e o remove da mensagem transmitida
+                msg['Bcc'] = ', '.join(destinatarios[1:])
+            
+            recusados = self._enviar_mensagem(msg)
+            if recusados:
+                logger.warning(f"Destinatários recusados pelo servidor: {', '.join(recusados)}")
+                return False
+            
+            logger.info(f"Email enviado com sucesso para {len(destinatarios)} destinatários")
+            return True
+            
+        except Exception as e:
+            logger.error(f"Erro ao enviar email: {e}")
+            return False
+    
+    def _enviar_mensagem(self, msg: EmailMessage) -> Dict[str, Any]:
+        """
+        Envia a mensagem em uma conexão própria (sem estado compartilhado entre
+        threads); retorna os destinatários recusados
+        """
+        with smtplib.SMTP(self.smtp_server, self.smtp_port) as servidor:
+            servidor.starttls()
+            servidor.login(self.email_usuario, self.email_senha)
+            return servidor.send_message(msg)
 
 class NotificadorSMS:
     """Gerenciador de notificações por SMS via Twilio"""
@@ -97,17 +323,23 @@ class NotificadorSMS:
         self.auth_token = os.getenv('TWILIO_AUTH_TOKEN')
         self.numero_twilio = os.getenv('TWILIO_PHONE_NUMBER')
         
+        # Cliente criado uma única vez: mantém a sessão HTTP (keep-alive) entre SMS
+        self._client = None
+        if TWILIO_DISPONIVEL and all([self.account_sid, self.auth_token]):
+            self._client = ClienteTwilio(self.account_sid, self.auth_token)
+        
     def enviar_sms(self, numero_destino: str, mensagem: str) -> bool:
         """Envia SMS para número específico"""
         try:
             if not all([self.account_sid, self.auth_token, self.numero_twilio]):
                 logger.warning("Credenciais do Twilio não configuradas")
                 return False
-                
-            from twilio.rest import Client
-            client = Client(self.account_sid, self.auth_token)
             
-            message = client.messages.create(
+            if self._client is None:
+                logger.warning("Biblioteca do Twilio não disponível. Instale: pip install twilio")
+                return False
+            
+            message = self._client.messages.create(
                 body=mensagem,
                 from_=self.numero_twilio,
                 to=numero_destino
@@ -123,30 +355,113 @@ class NotificadorSMS:
 class NotificadorWebhook:
     """Gerenciador de notificações via webhook"""
     
+    def __init__(self):
+        # Loop de eventos dedicado (thread daemon) com uma sessão aiohttp persistente,
+        # criado no primeiro envio: as conexões keep-alive duram entre notificações
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._sessao = None
+        self._lock = threading.Lock()
+        
+        # Sessão requests com pool keep-alive para os envios síncronos
+        self._cliente = requests.Session()
+        adaptador = HTTPAdapter(pool_connections=MAX_HOSTS_WEBHOOK, pool_maxsize=MAX_CONEXOES_POR_HOST_WEBHOOK)
+        self._cliente.mount('https://', adaptador)
+        self._cliente.mount('http://', adaptador)
+        self._cliente.headers['Content-Type'] = 'application/json'
+        atexit.register(self._cliente.close)
+    
+    def _obter_loop(self) -> asyncio.AbstractEventLoop:
+        """Inicia (uma única vez) o loop de eventos dos webhooks e a sessão HTTP"""
+        with self._lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name='webhooks', daemon=True).start()
+                
+                async def _criar_sessao():
+                    return aiohttp.ClientSession(
+                        connector=aiohttp.TCPConnector(
+                            limit=MAX_CONEXOES_WEBHOOK,
+                            limit_per_host=MAX_CONEXOES_POR_HOST_WEBHOOK
+                        ),
+                        timeout=aiohttp.ClientTimeout(total=TIMEOUT_WEBHOOK)
+                    )
+                
+                self._sessao = asyncio.run_coroutine_threadsafe(_criar_sessao(), loop).result()
+                self._loop = loop
+                atexit.register(self.fechar)
+            return self._loop
+    
+    def fechar(self):
+        """Fecha a sessão HTTP e encerra o loop dos webhooks"""
+        with self._lock:
+            loop, self._loop = self._loop, None
+            if loop is None:
+                return
+            try:
+                asyncio.run_coroutine_threadsafe(self._sessao.close(), loop).result(timeout=5)
+            except Exception as e:
+                logger.warning(f"Erro ao fechar sessão de webhooks: {e}")
+            loop.call_soon_threadsafe(loop.stop)
+            self._sessao = None
+    
     def enviar_webhook(self, url: str, dados: Dict[str, Any], headers: Optional[Dict[str, str]] = None) -> bool:
         """Envia notificação via webhook"""
         try:
-            headers_default = {'Content-Type': 'application/json'}
-            if headers:
-                headers_default.update(headers)
-                
-            response = requests.post(
+            # Content-Type padrão vem da sessão; headers extras são mesclados pelo requests.
+            # stream=True: o corpo da resposta só é lido (e no máximo 1 KiB) em caso de falha
+            with self._cliente.post(
                 url,
                 json=dados,
-                headers=headers_default,
-                timeout=30
-            )
-            
-            if response.status_code == 200:
-                logger.info(f"Webhook enviado com sucesso para {url}")
-                return True
-            else:
-                logger.warning(f"Webhook falhou: {response.status_code} - {response.text}")
+                headers=headers,
+                timeout=TIMEOUT_WEBHOOK,
+                stream=True
+            ) as response:
+                if response.status_code == 200:
+                    # Descarta o corpo sem decodificar, liberando a conexão para o pool
+                    response.raw.drain_conn()
+                    logger.info(f"Webhook enviado com sucesso para {url}")
+                    return True
+                
+                corpo = response.raw.read(LIMITE_CORPO_ERRO_WEBHOOK, decode_content=True)
+                logger.warning(f"Webhook falhou: {response.status_code} - {corpo.decode('utf-8', 'replace')}")
+                return False
+                
+        except Exception as e:
+            logger.error(f"Erro ao enviar webhook: {e}")
+            return False
+    
+    async def enviar_webhook_async(self, url: str, dados: Dict[str, Any], headers: Optional[Dict[str, str]] = None) -> bool:
+        """Envia notificação via webhook pela sessão aiohttp persistente"""
+        try:
+            async with self._sessao.post(url, json=dados, headers=headers) as response:
+                # Corpo sempre lido até o fim: só assim a conexão volta ao pool
+                corpo = await response.read()
+                if response.status == 200:
+                    logger.info(f"Webhook enviado com sucesso para {url}")
+                    return True
+                corpo = corpo[:LIMITE_CORPO_ERRO_WEBHOOK]
+                logger.warning(f"Webhook falhou: {response.status} - {corpo.decode('utf-8', 'replace')}")
                 return False
                 
         except Exception as e:
             logger.error(f"Erro ao enviar webhook: {e}")
             return False
+    
+    def enviar_para_todos(self, urls: List[str], dados: Dict[str, Any], headers: Optional[Dict[str, str]] = None) -> List[bool]:
+        """
+        Envia o mesmo payload para várias URLs em paralelo (tempo total ~ o da
+        URL mais lenta); sem aiohttp, envia em sequência
+        """
+        if not urls:
+            return []
+        
+        if not AIOHTTP_DISPONIVEL:
+            return [self.enviar_webhook(url, dados, headers) for url in urls]
+        
+        async def _enviar_todos():
+            return await asyncio.gather(*(self.enviar_webhook_async(url, dados, headers) for url in urls))
+        
+        return asyncio.run_coroutine_threadsafe(_enviar_todos(), self._obter_loop()).result()
 
 class SistemaNotificacoes:
     """Sistema principal de notificações do RPA"""
@@ -156,13 +471,20 @@ class SistemaNotificacoes:
         self.notificador_sms = NotificadorSMS()
         self.notificador_webhook = NotificadorWebhook()
         self.configuracoes = self._carregar_configuracoes()
+        self._eventos_resolvidos = self._resolver_eventos()
+        
+        # Digest do último conteúdo gravado (evita regravar configurações idênticas)
+        self._digest_configuracoes: Optional[bytes] = None
         
     def _carregar_configuracoes(self) -> Dict[str, Any]:
         """Carrega configurações de notificação"""
         try:
-            if os.path.exists('config/notificacoes.json'):
-                with open('config/notificacoes.json', 'r', encoding='utf-8') as f:
-                    return json.load(f)
+            if os.path.exists(ARQUIVO_CONFIGURACOES):
+                info = os.stat(ARQUIVO_CONFIGURACOES)
+                # Cópia profunda: a instância pode alterar listas/dicts sem afetar o cache
+                return copy.deepcopy(
+                    ler_configuracoes_arquivo(ARQUIVO_CONFIGURACOES, info.st_mtime_ns, info.st_size)
+                )
         except Exception as e:
             logger.warning(f"Erro ao carregar configurações: {e}")
             
@@ -204,12 +526,33 @@ class SistemaNotificacoes:
             }
         }
     
+    def _resolver_eventos(self) -> Dict[EventoRPA, _ConfigEvento]:
+        """
+        Converte a seção 'eventos' das configurações em um dict indexado pelo
+        próprio EventoRPA (refeito a cada salvar_configuracoes)
+        """
+        eventos = self.configuracoes.get('eventos', {})
+        resolvidos = {}
+        for evento in EventoRPA:
+            config_evento = eventos.get(evento.value)
+            if config_evento is not None:
+                resolvidos[evento] = _ConfigEvento(
+                    canais=tuple(config_evento.get('canais', ())),
+                    prioridade=config_evento.get('prioridade', PrioridadeNotificacao.MEDIA.value)
+                )
+        return resolvidos
+    
     def salvar_configuracoes(self):
         """Salva configurações de notificação"""
+        self._eventos_resolvidos = self._resolver_eventos()
         try:
-            os.makedirs('config', exist_ok=True)
-            with open('config/notificacoes.json', 'w', encoding='utf-8') as f:
-                json.dump(self.configuracoes, f, indent=2, ensure_ascii=False)
+            dados = serializar_configuracoes(self.configuracoes)
+            digest = hashlib.blake2b(dados, digest_size=16).digest()
+            if digest == self._digest_configuracoes:
+                return
+            
+            gravar_configuracoes_arquivo(ARQUIVO_CONFIGURACOES, dados)
+            self._digest_configuracoes = digest
         except Exception as e:
             logger.error(f"Erro ao salvar configurações: {e}")
     
@@ -218,21 +561,32 @@ class SistemaNotificacoes:
         resultado = {}
         
         try:
-            config_evento = self.configuracoes.get('eventos', {}).get(evento.value, {})
-            canais = config_evento.get('canais', [])
-            prioridade = config_evento.get('prioridade', PrioridadeNotificacao.MEDIA.value)
+            config_evento = self._eventos_resolvidos.get(evento, _CONFIG_EVENTO_PADRAO)
+            canais = config_evento.canais
+            prioridade = config_evento.prioridade
             
             # Gerar conteúdo da notificação
             conteudo = self._gerar_conteudo_notificacao(evento, dados, prioridade)
             
-            # Enviar por cada canal configurado
+            envios = {
+                TipoNotificacao.EMAIL.value: ('email', self._enviar_notificacao_email),
+                TipoNotificacao.SMS.value: ('sms', self._enviar_notificacao_sms),
+                TipoNotificacao.WEBHOOK.value: ('webhook', self._enviar_notificacao_webhook)
+            }
+            
+            # Enviar por todos os canais configurados em paralelo (latência = canal mais lento)
+            futuros = {}
             for canal in canais:
-                if canal == TipoNotificacao.EMAIL.value:
-                    resultado['email'] = self._enviar_notificacao_email(evento, conteudo, dados)
-                elif canal == TipoNotificacao.SMS.value:
-                    resultado['sms'] = self._enviar_notificacao_sms(evento, conteudo, dados)
-                elif canal == TipoNotificacao.WEBHOOK.value:
-                    resultado['webhook'] = self._enviar_notificacao_webhook(evento, conteudo, dados)
+                if canal in envios:
+                    nome, enviar = envios[canal]
+                    futuros[nome] = _POOL_CANAIS.submit(enviar, evento, conteudo, dados)
+            
+            for nome, futuro in futuros.items():
+                try:
+                    resultado[nome] = futuro.result()
+                except Exception as e:
+                    logger.error(f"Erro no canal {nome} do evento {evento.value}: {e}")
+                    resultado[nome] = False
             
             # Log do resultado
             sucessos = sum(1 for v in resultado.values() if v)
@@ -248,48 +602,24 @@ class SistemaNotificacoes:
         """Gera conteúdo personalizado para cada tipo de notificação"""
         timestamp = datetime.now().strftime('%d/%m/%Y %H:%M:%S')
         
-        # Mapeamento de eventos para títulos e mensagens
-        templates = {
-            EventoRPA.RPA_INICIADO: {
-                'assunto': f'🚀 RPA Iniciado - {dados.get("nome_rpa", "Sistema")}',
-                'corpo': f'RPA "{dados.get("nome_rpa", "Desconhecido")}" foi iniciado às {timestamp}.',
-                'sms': f'RPA {dados.get("nome_rpa", "")} iniciado às {timestamp}'
-            },
-            EventoRPA.RPA_CONCLUIDO: {
-                'assunto': f'✅ RPA Concluído com Sucesso - {dados.get("nome_rpa", "Sistema")}',
-                'corpo': f'RPA "{dados.get("nome_rpa", "")}" concluído com sucesso.\nTempo de execução: {dados.get("tempo_execucao", "N/A")}\nResultados: {dados.get("resumo_resultados", "N/A")}',
-                'sms': f'✅ RPA {dados.get("nome_rpa", "")} concluído com sucesso em {dados.get("tempo_execucao", "")}'
-            },
-            EventoRPA.RPA_ERRO: {
-                'assunto': f'❌ ERRO no RPA - {dados.get("nome_rpa", "Sistema")}',
-                'corpo': f'ERRO detectado no RPA "{dados.get("nome_rpa", "")}".\nErro: {dados.get("erro", "Não especificado")}\nDetalhes: {dados.get("detalhes", "N/A")}\nAção necessária: Verificar logs e corrigir problema.',
-                'sms': f'❌ ERRO no RPA {dados.get("nome_rpa", "")}: {dados.get("erro", "")[:100]}'
-            },
-            EventoRPA.WORKFLOW_CONCLUIDO: {
-                'assunto': f'🔄 Workflow Completo - Sistema RPA',
-                'corpo': f'Workflow de reparcelamento concluído.\nRPAs executados: {dados.get("rpas_executados", "N/A")}\nContratos processados: {dados.get("contratos_processados", 0)}\nTempo total: {dados.get("tempo_total", "N/A")}',
-                'sms': f'🔄 Workflow concluído: {dados.get("contratos_processados", 0)} contratos processados'
-            },
-            EventoRPA.INDICES_ATUALIZADOS: {
-                'assunto': f'📊 Índices Econômicos Atualizados',
-                'corpo': f'Índices econômicos atualizados com sucesso.\nIPCA: {dados.get("ipca", "N/A")}\nIGPM: {dados.get("igpm", "N/A")}\nData de referência: {dados.get("data_referencia", "N/A")}',
-                'sms': f'📊 Índices atualizados: IPCA {dados.get("ipca", "")} IGPM {dados.get("igpm", "")}'
-            },
-            EventoRPA.CONTRATOS_IDENTIFICADOS: {
-                'assunto': f'📋 Contratos para Reparcelamento Identificados',
-                'corpo': f'Foram identificados {dados.get("quantidade_contratos", 0)} contratos para reparcelamento.\nCritérios: {dados.get("criterios", "N/A")}\nPróxima ação: Processamento automático via RPAs 3 e 4.',
-                'sms': f'📋 {dados.get("quantidade_contratos", 0)} contratos identificados para reparcelamento'
+        formatos = _TEMPLATES_EVENTO.get(evento)
+        if formatos is None:
+            template = {
+                'assunto': f'Sistema RPA - {evento.value}',
+                'corpo': f'Evento: {evento.value}\nDados: {json.dumps(dados, indent=2)}',
+                'sms': f'Sistema RPA: {evento.value}'
+            }
+        else:
+            assunto, corpo, sms = formatos
+            valores = {'timestamp': timestamp}
+            template = {
+                'assunto': assunto.format_map(ChainMap(valores, dados, _PADROES_ASSUNTO)),
+                'corpo': corpo.format_map(ChainMap(valores, dados, _PADROES_CORPO_EVENTO.get(evento, _VAZIO), _PADROES_CORPO)),
+                'sms': sms.format_map(ChainMap(valores, dados, _PADROES_SMS))
             }
-        }
-        
-        template = templates.get(evento, {
-            'assunto': f'Sistema RPA - {evento.value}',
-            'corpo': f'Evento: {evento.value}\nDados: {json.dumps(dados, indent=2)}',
-            'sms': f'Sistema RPA: {evento.value}'
-        })
         
         # Adicionar prioridade ao assunto se alta ou crítica
-        if prioridade in [PrioridadeNotificacao.ALTA.value, PrioridadeNotificacao.CRITICA.value]:
+        if prioridade in _PRIORIDADES_DESTACADAS:
             template['assunto'] = f"[{prioridade.upper()}] {template['assunto']}"
         
         return template
@@ -304,17 +634,13 @@ class SistemaNotificacoes:
         # Gerar HTML para email
         corpo_html = self._gerar_email_html(evento, conteudo, dados)
         
-        sucesso = True
-        for destinatario in destinatarios:
-            resultado = self.notificador_email.enviar_email(
-                destinatario,
-                conteudo['assunto'],
-                corpo_html,
-                html=True
-            )
-            sucesso = sucesso and resultado
-            
-        return sucesso
+        # Conteúdo idêntico para todos: uma única transação SMTP (um só DATA)
+        return self.notificador_email.enviar_email_multiplos(
+            destinatarios,
+            conteudo['assunto'],
+            corpo_html,
+            html=True
+        )
     
     def _enviar_notificacao_sms(self, evento: EventoRPA, conteudo: Dict[str, str], dados: Dict[str, Any]) -> bool:
         """Envia notificação por SMS"""
@@ -345,61 +671,13 @@ class SistemaNotificacoes:
             'dados': dados
         }
         
-        sucesso = True
-        for url in urls:
-            resultado = self.notificador_webhook.enviar_webhook(url, payload)
-            sucesso = sucesso and resultado
-            
-        return sucesso
+        # Todas as URLs em paralelo
+        return all(self.notificador_webhook.enviar_para_todos(urls, payload))
     
     def _gerar_email_html(self, evento: EventoRPA, conteudo: Dict[str, str], dados: Dict[str, Any]) -> str:
         """Gera email em formato HTML"""
-        # Cores baseadas no tipo de evento
-        cores = {
-            EventoRPA.RPA_CONCLUIDO: "#28a745",
-            EventoRPA.WORKFLOW_CONCLUIDO: "#28a745",
-            EventoRPA.RPA_ERRO: "#dc3545",
-            EventoRPA.ERRO_CRITICO: "#dc3545",
-            EventoRPA.RPA_INICIADO: "#007bff",
-            EventoRPA.INDICES_ATUALIZADOS: "#17a2b8",
-            EventoRPA.CONTRATOS_IDENTIFICADOS: "#ffc107"
-        }
-        
-        cor = cores.get(evento, "#6c757d")
-        
-        return f"""
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <meta charset="UTF-8">
-            <title>{conteudo['assunto']}</title>
-        </head>
-        <body style="font-family: Arial, sans-serif; margin: 0; padding: 20px; background-color: #f8f9fa;">
-            <div style="max-width: 600px; margin: 0 auto; background-color: white; border-radius: 8px; box-shadow: 0 2px 4px rgba(0,0,0,0.1);">
-                <div style="background-color: {cor}; color: white; padding: 20px; border-radius: 8px 8px 0 0;">
-                    <h1 style="margin: 0; font-size: 24px;">{conteudo['assunto']}</h1>
-                </div>
-                <div style="padding: 20px;">
-                    <div style="white-space: pre-line; line-height: 1.6; color: #333;">
-                        {conteudo['corpo']}
-                    </div>
-                    <div style="margin-top: 20px; padding: 15px; background-color: #f8f9fa; border-radius: 4px; border-left: 4px solid {cor};">
-                        <strong>Detalhes Técnicos:</strong><br>
-                        <small style="color: #666;">
-                            Sistema: RPA de Reparcelamento v2.0<br>
-                            Timestamp: {datetime.now().strftime('%d/%m/%Y %H:%M:%S')}<br>
-                            Evento: {evento.value}
-                        </small>
-                    </div>
-                </div>
-                <div style="padding: 20px; background-color: #f8f9fa; border-radius: 0 0 8px 8px; text-align: center; color: #666; font-size: 12px;">
-                    Esta é uma notificação automática do Sistema RPA de Reparcelamento.<br>
-                    Não responda a este email.
-                </div>
-            </div>
-        </body>
-        </html>
-        """
+        antes, depois = _renderizar_email_html(evento, conteudo['assunto'], conteudo['corpo'])
+        return "".join((antes, datetime.now().strftime('%d/%m/%Y %H:%M:%S'), depois))
     
     def testar_configuracao(self) -> Dict[str, Any]:
         """Testa todas as configurações de notificação"""
@@ -435,8 +713,45 @@ class SistemaNotificacoes:
         
         return resultados
 
-# Instância global do sistema de notificações
-sistema_notificacoes = SistemaNotificacoes()
+class _SistemaNotificacoesPreguicoso:
+    """
+    Proxy da instância global: o SistemaNotificacoes (configurações, notificadores,
+    cliente Twilio, sessão HTTP) só é construído no primeiro acesso a um atributo,
+    ou antes disso via preaquecer_notificacoes()
+    """
+    
+    __slots__ = ('_instancia', '_lock')
+    
+    def __init__(self):
+        object.__setattr__(self, '_instancia', None)
+        object.__setattr__(self, '_lock', threading.Lock())
+    
+    def _obter(self) -> SistemaNotificacoes:
+        """Retorna a instância real, criando-a uma única vez (thread-safe)"""
+        instancia = self._instancia
+        if instancia is None:
+            with self._lock:
+                instancia = self._instancia
+                if instancia is None:
+                    instancia = SistemaNotificacoes()
+                    object.__setattr__(self, '_instancia', instancia)
+        return instancia
+    
+    def __getattr__(self, nome: str):
+        return getattr(self._obter(), nome)
+    
+    def __setattr__(self, nome: str, valor: Any):
+        setattr(self._obter(), nome, valor)
+
+# Instância global do sistema de notificações (criada no primeiro uso)
+sistema_notificacoes = _SistemaNotificacoesPreguicoso()
+
+def preaquecer_notificacoes():
+    """
+    Cria a instância global antecipadamente (ex.: na inicialização da aplicação),
+    para que o primeiro evento não pague o custo de setup
+    """
+    sistema_notificacoes._obter()
 
 def notificar(evento: EventoRPA, dados: Dict[str, Any]) -> Dict[str, bool]:
     """Função utilitária para notificar eventos"""
@@ -8,9 +8,36 @@ Desenvolvido em Português Brasileiro
 import streamlit as st
 import json
 import os
+import time
 from datetime import datetime
 from core.notificacoes_simples import notificacoes, testar_notificacoes
 
+# Intervalo mínimo (s) entre dois salvamentos (cliques repetidos no botão)
+INTERVALO_MINIMO_SALVAMENTO = 0.5
+
+def _sincronizar_emails():
+    """Copia para a lista da sessão os valores digitados nos campos de email"""
+    emails = st.session_state['emails']
+    for i in range(len(emails)):
+        emails[i] = st.session_state.get(f"email_{i}", emails[i])
+
+def _limpar_campos_emails(quantidade: int):
+    """Remove o estado dos campos de email (recriados a partir da lista na próxima renderização)"""
+    for i in range(quantidade):
+        st.session_state.pop(f"email_{i}", None)
+
+def _adicionar_email():
+    """Callback do botão de adicionar email (roda antes da renderização, sem st.rerun)"""
+    _sincronizar_emails()
+    st.session_state['emails'].append("")
+
+def _remover_email(indice: int):
+    """Callback do botão de remover email"""
+    _sincronizar_emails()
+    emails = st.session_state['emails']
+    emails.pop(indice)
+    _limpar_campos_emails(len(emails) + 1)
+
 def renderizar_aba_notificacoes():
     """Renderiza aba de configuração de notificações"""
     
@@ -19,6 +46,12 @@ def renderizar_aba_notificacoes():
     # Carregar configurações atuais
     config = notificacoes.configuracoes
     
+    # Lista de emails em edição fica na sessão: adicionar/remover só altera a lista
+    if 'emails' not in st.session_state:
+        st.session_state['emails'] = list(config.get('destinatarios', ['admin@empresa.com']))
+    emails_atuais = st.session_state['emails']
+    eventos_config = config.get('eventos', {})
+    
     col1, col2 = st.columns([2, 1])
     
     with col1:
@@ -35,9 +68,6 @@ def renderizar_aba_notificacoes():
             # Configuração de destinatários
             st.subheader("📬 Destinatários")
             
-            # Lista atual de emails
-            emails_atuais = config.get('destinatarios', ['admin@empresa.com'])
-            
             # Editor de emails
             for i, email in enumerate(emails_atuais):
                 col_email, col_remover = st.columns([3, 1])
@@ -52,20 +82,15 @@ def renderizar_aba_notificacoes():
                 
                 with col_remover:
                     if len(emails_atuais) > 1:  # Manter pelo menos um email
-                        if st.button("🗑️", key=f"remover_{i}", help="Remover este email"):
-                            emails_atuais.pop(i)
-                            st.rerun()
+                        st.button("🗑️", key=f"remover_{i}", help="Remover este email",
+                                  on_click=_remover_email, args=(i,))
             
             # Botão para adicionar novo email
-            if st.button("➕ Adicionar Email"):
-                emails_atuais.append("")
-                st.rerun()
+            st.button("➕ Adicionar Email", on_click=_adicionar_email)
             
             # Configuração de eventos
             st.subheader("📅 Eventos para Notificar")
             
-            eventos_config = config.get('eventos', {})
-            
             col_evento1, col_evento2 = st.columns(2)
             
             with col_evento1:
@@ -121,12 +146,18 @@ def renderizar_aba_notificacoes():
                     }
                 }
                 
-                notificacoes.configuracoes.update(nova_config)
-                notificacoes.salvar_configuracoes()
+                # Só grava se algo mudou e se não houve outro salvamento há instantes
+                agora = time.monotonic()
+                alterado = any(notificacoes.configuracoes.get(chave) != valor for chave, valor in nova_config.items())
+                recente = agora - st.session_state.get('ultimo_salvamento', 0.0) < INTERVALO_MINIMO_SALVAMENTO
                 
-                st.success("✅ Configurações salvas com sucesso!")
-                time.sleep(1)
-                st.rerun()
+                if alterado and not recente:
+                    notificacoes.configuracoes.update(nova_config)
+                    notificacoes.salvar_configuracoes()
+                    st.session_state['ultimo_salvamento'] = agora
+                    st.success("✅ Configurações salvas com sucesso!")
+                elif not alterado:
+                    st.info("ℹ️ Nenhuma alteração para salvar")
         
         with col_testar:
             if st.button("🧪 Testar Notificações", use_container_width=True):
@@ -159,6 +190,10 @@ def renderizar_aba_notificacoes():
                     notificacoes.configuracoes.update(config_padrao)
                     notificacoes.salvar_configuracoes()
                     
+                    # Recarregar a lista de emails da sessão a partir das configurações
+                    _limpar_campos_emails(len(emails_atuais))
+                    del st.session_state['emails']
+                    
                     st.success("✅ Configurações restauradas!")
                     time.sleep(1)
                     st.rerun()
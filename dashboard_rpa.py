@@ -69,13 +69,21 @@ class DashboardRPA:
     
     def __init__(self):
         self.api_url = "http://localhost:5000"
-        self.arquivo_historico = "logs/historico_execucoes.json"
+        self.arquivo_historico = "logs/historico_execucoes.jsonl"
+        self.arquivo_historico_legado = "logs/historico_execucoes.json"
         
     def carregar_historico(self) -> List[Dict]:
-        """Carrega histórico de execuções"""
+        """Carrega histórico de execuções (JSONL, linha a linha)"""
         try:
             if os.path.exists(self.arquivo_historico):
+                historico = []
                 with open(self.arquivo_historico, 'r', encoding='utf-8') as f:
+                    for linha in f:
+                        if linha.strip():
+                            historico.append(json.loads(linha))
+                return historico
+            if os.path.exists(self.arquivo_historico_legado):
+                with open(self.arquivo_historico_legado, 'r', encoding='utf-8') as f:
                     return json.load(f)
             return []
         except:
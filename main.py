@@ -416,11 +416,17 @@ def main():
     print("   POST /rpa/sicredi            - RPA 4: WebBank Sicredi")
     print("=" * 80)
     
+    # uvloop + httptools; reload (dev) é incompatível com múltiplos workers
+    reload = os.getenv("API_RELOAD", "false").lower() == "true"
+    
     uvicorn.run(
         "main:app",
         host="0.0.0.0",
         port=5000,
-        reload=True,
+        reload=reload,
+        workers=None if reload else int(os.getenv("API_WORKERS", "1")),
+        loop="uvloop",
+        http="httptools",
         log_level="info"
     )
 
@@ -141,15 +141,17 @@ class RPAColetaIndices(BaseRPA):
             else:
                 raise Exception("Browser não foi inicializado corretamente.")
 
-            # Aguarda carregamento completo
-            time.sleep(2)
-
             self.log_progresso("Capturando o IPCA do IBGE")
-            ipca_valor = self.browser.find_element(
-                xpath="(//p[@class='variavel-dado'])[2]").text
-
-            ipca_mes_ref = self.browser.find_element(
-                xpath="(//p[@class='variavel-periodo'])[2]").text
+            # find_many aguarda (polling) até os dois elementos existirem na página
+            elemento_valor, elemento_mes = self.browser.find_many([
+                "(//p[@class='variavel-dado'])[2]",
+                "(//p[@class='variavel-periodo'])[2]"
+            ])
+            if elemento_valor is None or elemento_mes is None:
+                raise Exception("Valor ou período do IPCA não encontrado na página do IBGE")
+
+            ipca_valor = elemento_valor.text
+            ipca_mes_ref = elemento_mes.text
             # Se o scrapping retornar o mês junto com o valor, extrair e converter
             # Por enquanto, usa o mês atual formatado
 